@@ -105,12 +105,23 @@ def delete_user_by_id(user_id, token):
     response.raise_for_status()
 
 
+def get_all_pages(url, headers=None):
+    results = []
+    params = {}
+    while True:
+        response = requests.get(url, params=params, headers=headers)
+        response.raise_for_status()
+        page = response.json()
+        results.extend(page["items"])
+        if page.get("next_cursor") is None:
+            return results
+        params = {"after_id": page["next_cursor"]}
+
+
 @st.cache_resource(ttl=30)
 def get_all_items():
     url = f"{BASE_URL}/item/"
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.json()
+    return get_all_pages(url)
 
 
 def add_item_to_favorite_items(user_id, item_id):
@@ -1,7 +1,11 @@
-from pydantic import BaseSettings
+from typing import Dict, List, Optional
+
+from pydantic import BaseSettings, validator
 
 
 class Config(BaseSettings):
+    RUNTIME_PROFILE: str = "mysql"
+    LOCAL_DATABASE_PATH: str = "local.db"
     MYSQL_USER: str = "user"
     MYSQL_PASSWORD: str = "password"
     MYSQL_DATABASE: str = "main"
@@ -10,7 +14,51 @@ class Config(BaseSettings):
     REDIS_HOST: str = "localhost"
     REDIS_PORT: str = "6379"
     REDIS_TTL: int = 100
-    DATABASE_URL: str = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
+    NEGATIVE_CACHE_TTL: int = 10
+    CACHE_NAMESPACE_TTLS: Dict[str, int] = {"catalog": 100, "cart": 60, "user": 300}
+    CACHE_TTL_JITTER: float = 0.1
+    CACHE_VERSION_TTL: int = 3600
+    REDIS_MEMORY_BUDGET: int = 256 * 1024 * 1024
+    REDIS_EVICTION_POLICIES: List[str] = ["volatile-lru", "volatile-lfu", "volatile-ttl"]
+    CACHE_MEMORY_SAMPLE_SIZE: int = 10000
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 2.0
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    REDIS_CONNECT_TIMEOUT: float = 1.0
+    LOCAL_CACHE_MAX_SIZE: int = 1024
+    LOCAL_CACHE_TTL: float = 10.0
+    CACHE_LOCK_TIMEOUT: float = 5.0
+    CACHE_LOCK_POLL_INTERVAL: float = 0.05
+    CACHE_EARLY_REFRESH_BETA: float = 1.0
+    CACHE_CODEC: str = "msgpack"
+    CATALOG_REFRESH_INTERVAL: float = 60.0
+    CATALOG_REFRESH_JITTER: float = 10.0
+    CATALOG_MAX_STALENESS: int = 120
+    CACHE_SCHEMA_VERSION: int = 1
+    DATABASE_DRIVER: str = "aiomysql"
+    DATABASE_URL: Optional[str] = None
+    DATABASE_MIN_POOL_SIZE: int = 1
+    DATABASE_MAX_POOL_SIZE: int = 10
+    DATABASE_ACQUIRE_TIMEOUT: float = 5.0
+    DATABASE_POOL_RECYCLE: int = 3600
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_PIN_SECONDS: int = 5
     SECRET_KEY: str = "secret_key_app"
     ALGORITHM: str = "HS256"
     TOKEN_EXPIRY_TIME: float = 20.0
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 500
+    STREAM_FETCH_SIZE: int = 1000
+    USER_DELETE_CHUNK_SIZE: int = 500
+    DEBUG: bool = False
+    REQUEST_QUERY_BUDGET: int = 20
+    REQUEST_REDIS_BUDGET: int = 50
+
+    @validator("DATABASE_URL", always=True)
+    def build_database_url(cls, url: Optional[str], values: dict) -> str:
+        if url:
+            return url
+        return (
+            f"mysql+{values['DATABASE_DRIVER']}://{values['MYSQL_USER']}:{values['MYSQL_PASSWORD']}"
+            f"@{values['MYSQL_HOST']}:{values['MYSQL_PORT']}/{values['MYSQL_DATABASE']}"
+        )
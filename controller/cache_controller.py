@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from repository import cache_repository
+
+router = APIRouter(
+    prefix="/cache",
+    tags=["cache"]
+)
+
+
+@router.get("/stats", response_model=dict)
+async def get_cache_stats():
+    return cache_repository.get_cache_stats()
+
+
+@router.get("/memory", response_model=dict)
+async def get_cache_memory_usage():
+    return await cache_repository.get_namespace_memory_usage()
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+
+from repository import database
+
+router = APIRouter(
+    prefix="/database",
+    tags=["database"]
+)
+
+
+@router.get("/pool", response_model=dict)
+async def get_pool_stats():
+    return database.get_pool_stats()
@@ -1,13 +1,17 @@
 from typing import List, Optional
 
-from fastapi import HTTPException, APIRouter
+from fastapi import HTTPException, APIRouter, Query
 
+from config.config import Config
 from model.favorite_item import FavoriteItem
 from model.favorite_item_request import FavoriteItemRequest
 from model.favorite_item_response import FavoriteItemResponse
+from model.page import Page
 from repository import favorite_item_repository
 from service import favorite_item_service, user_service
 
+config = Config()
+
 router = APIRouter(
     prefix="/favorite_item",
     tags=["favorite_item"]
@@ -30,9 +34,12 @@ async def get_favorite_items_by_user_id(user_id: int) -> List[FavoriteItemRespon
     return await favorite_item_service.get_favorite_items_by_user_id(user_id)
 
 
-@router.get("/")
-async def get_all_favorite_items() -> List[FavoriteItem]:
-    return await favorite_item_service.get_all_favorite_items()
+@router.get("/", response_model=Page[FavoriteItem])
+async def get_all_favorite_items(
+        limit: int = Query(config.PAGE_SIZE_DEFAULT, gt=0, le=config.PAGE_SIZE_MAX),
+        after_id: int = Query(0, ge=0)
+) -> Page[FavoriteItem]:
+    return await favorite_item_service.get_all_favorite_items(limit, after_id)
 
 
 @router.post("/")
@@ -48,7 +55,7 @@ async def update_favorite_items(favorite_item_id: int, favorite_item: FavoriteIt
     favorite_item_exists = await favorite_item_service.get_by_id(favorite_item_id)
     if not favorite_item_exists:
         raise HTTPException(status_code=404, detail=f"Can't update favorite item with id:{favorite_item_id}, favorite item not found...")
-    await favorite_item_service.update_favorite_items(favorite_item_id, favorite_item)
+    await favorite_item_service.update_favorite_items(favorite_item_id, favorite_item, favorite_item_exists.user_id)
     return await favorite_item_service.get_by_id(favorite_item_id)
 
 
@@ -57,7 +64,7 @@ async def delete_by_id(favorite_item_id: int):
     favorite_item_exists = await favorite_item_service.get_by_id(favorite_item_id)
     if not favorite_item_exists:
         raise HTTPException(status_code=404, detail=f"Can't delete favorite item with id:{favorite_item_id}, favorite item not found...")
-    await favorite_item_service.delete_by_id(favorite_item_id)
+    await favorite_item_service.delete_by_id(favorite_item_id, favorite_item_exists.user_id)
 
 
 @router.delete("/{user_id}/item/{item_id}")
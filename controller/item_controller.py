@@ -1,10 +1,12 @@
-from typing import List
-
-from fastapi import HTTPException, APIRouter
+from fastapi import HTTPException, APIRouter, Query
 
+from config.config import Config
 from model.item import Item
+from model.page import Page
 from service import item_service
 
+config = Config()
+
 router = APIRouter(
     prefix="/item",
     tags=["item"]
@@ -19,9 +21,12 @@ async def get_item_by_id(item_id: int):
     return item
 
 
-@router.get("/", response_model=List[Item])
-async def get_all_items():
-    return await item_service.get_all_items()
+@router.get("/", response_model=Page[Item])
+async def get_all_items(
+        limit: int = Query(config.PAGE_SIZE_DEFAULT, gt=0, le=config.PAGE_SIZE_MAX),
+        after_id: int = Query(0, ge=0)
+):
+    return await item_service.get_all_items(limit, after_id)
 
 
 @router.post("/", response_model=Item)
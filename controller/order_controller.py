@@ -1,15 +1,20 @@
-from typing import List, Optional
+from typing import Optional
 
-from fastapi import HTTPException, APIRouter
+from fastapi import HTTPException, APIRouter, Query
+from fastapi.responses import StreamingResponse
 
+from config.config import Config
 from model.order import Order
 from model.order_close import OrderClose
 from model.order_item_quantity import OrderItemQuantity
 from model.order_request import OrderRequest
 from model.order_response import OrderResponse
 from model.order_status import OrderStatus
+from model.page import Page
 from repository import order_repository, order_item_repository
-from service import order_service, user_service
+from service import export_service, order_service, user_service
+
+config = Config()
 
 router = APIRouter(
     prefix="/order",
@@ -17,6 +22,22 @@ router = APIRouter(
 )
 
 
+@router.get("/export")
+async def export_orders(export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$")):
+    return StreamingResponse(
+        order_service.export_orders(export_format),
+        media_type=export_service.EXPORT_MEDIA_TYPES[export_format]
+    )
+
+
+@router.get("/items/export")
+async def export_order_items(export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$")):
+    return StreamingResponse(
+        order_service.export_order_items(export_format),
+        media_type=export_service.EXPORT_MEDIA_TYPES[export_format]
+    )
+
+
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order_by_id(order_id: int) -> Optional[OrderResponse]:
     return await order_service.get_order_by_id(order_id)
@@ -52,10 +73,13 @@ async def get_temp_order(user_id: int):
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
-@router.get("/", response_model=Optional[List[Order]])
-async def get_all_orders():
+@router.get("/", response_model=Page[Order])
+async def get_all_orders(
+        limit: int = Query(config.PAGE_SIZE_DEFAULT, gt=0, le=config.PAGE_SIZE_MAX),
+        after_id: int = Query(0, ge=0)
+):
     try:
-        return await order_service.get_all_orders()
+        return await order_service.get_all_orders(limit, after_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred while fetching all orders. Error: {e}")
 
@@ -85,7 +109,7 @@ async def update_order(order_id: int, order_request: OrderRequest):
 @router.put("/update_order_quantities/")
 async def update_temp_order_quantities(request: OrderItemQuantity):
     try:
-        await order_service.update_temp_order(request.user_id, request.item_id, request.quantity)
+        return await order_service.update_temp_order(request.user_id, request.item_id, request.quantity)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -1,14 +1,18 @@
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
 from fastapi.security import OAuth2PasswordBearer
 from starlette import status
 
+from config.config import Config
 from exceptions.security_exceptions import token_exception
+from model.page import Page
 from model.user_request import UserRequest
 from model.user_response import UserResponse
 from service import auth_service, user_service
 
+config = Config()
+
 router = APIRouter(
     prefix="/user",
     tags=["user"],
@@ -25,11 +29,15 @@ async def get_user_by_id(user: UserResponse = Depends(auth_service.validate_user
     return await user_service.get_user_by_id(user_id)
 
 
-@router.get("/", status_code=status.HTTP_200_OK)
-async def get_users(user: UserResponse = Depends(auth_service.validate_user)):
+@router.get("/", status_code=status.HTTP_200_OK, response_model=Page[UserResponse])
+async def get_users(
+        user: UserResponse = Depends(auth_service.validate_user),
+        limit: int = Query(config.PAGE_SIZE_DEFAULT, gt=0, le=config.PAGE_SIZE_MAX),
+        after_id: int = Query(0, ge=0)
+):
     if user is None:
         raise token_exception()
-    return await user_service.get_all_users()
+    return await user_service.get_all_users(limit, after_id)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
@@ -58,11 +66,21 @@ async def logout_user(token: str = Depends(oauth2_bearer)):
 
 
 @router.delete("/{user_id}")
-async def delete_user_by_id(user_id: int, token: str = Depends(oauth2_bearer)):
+async def delete_user_by_id(
+        user_id: int,
+        response: Response,
+        background_tasks: BackgroundTasks,
+        background: bool = Query(False),
+        token: str = Depends(oauth2_bearer)
+):
     user_response = await auth_service.validate_user(token)
     if user_response is None:
         raise token_exception()
     user_exists = await user_service.get_user_by_id(user_id)
     if not user_exists:
         raise HTTPException(status_code=404, detail=f"Can't delete user with id:{user_id}, user not found...")
+    if background:
+        background_tasks.add_task(user_service.delete_user_by_id, user_id, config.USER_DELETE_CHUNK_SIZE)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return
     await user_service.delete_user_by_id(user_id)
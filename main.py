@@ -1,24 +1,70 @@
-from fastapi import FastAPI
-from repository.database import database
+import asyncio
+import json
+import logging
+import time
+
+from fastapi import FastAPI, Request
+from config.config import Config
+from repository import cache_repository, item_repository, database, request_metrics
 from controller.user_controller import router as user_router
 from controller.item_controller import router as item_router
 from controller.order_controller import router as order_router
 from controller.favorite_item_controller import router as favorite_item_router
 from controller.auth_controller import router as auth_router
 from controller.churn_prediction_controller import router as user_data_router
+from controller.cache_controller import router as cache_router
+from controller.database_controller import router as database_router
 
+config = Config()
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    metrics = request_metrics.start_request_metrics()
+    item_repository.start_request_item_loader()
+    started = time.monotonic()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    over_budget = (
+        metrics["db_queries"] > config.REQUEST_QUERY_BUDGET or metrics["redis_commands"] > config.REQUEST_REDIS_BUDGET
+    )
+    logger.log(logging.WARNING if over_budget else logging.INFO, json.dumps({
+        "method": request.method,
+        "route": route.path if route else request.url.path,
+        "status": response.status_code,
+        "duration_ms": round((time.monotonic() - started) * 1000, 2),
+        "db_queries": metrics["db_queries"],
+        "db_ms": round(metrics["db_ms"], 2),
+        "redis_commands": metrics["redis_commands"],
+        "redis_ms": round(metrics["redis_ms"], 2),
+        "over_budget": over_budget,
+    }))
+    if config.DEBUG:
+        response.headers["X-DB-Queries"] = str(metrics["db_queries"])
+        response.headers["X-DB-Time-Ms"] = f"{metrics['db_ms']:.2f}"
+        response.headers["X-Redis-Commands"] = str(metrics["redis_commands"])
+        response.headers["X-Redis-Time-Ms"] = f"{metrics['redis_ms']:.2f}"
+    return response
+
+
 @app.on_event("startup")
 async def startup():
     await database.connect()
+    await cache_repository.check_memory_policy()
+    app.state.cache_listener = asyncio.create_task(cache_repository.listen_for_invalidations())
+    await item_repository.warm_catalog_cache()
+    app.state.catalog_refresher = asyncio.create_task(item_repository.refresh_catalog_cache())
 
 
 @app.on_event("shutdown")
 async def shutdown():
+    app.state.cache_listener.cancel()
+    app.state.catalog_refresher.cancel()
     await database.disconnect()
+    await cache_repository.close()
 
 app.include_router(user_router)
 app.include_router(item_router)
@@ -26,3 +72,5 @@ app.include_router(order_router)
 app.include_router(favorite_item_router)
 app.include_router(auth_router)
 app.include_router(user_data_router)
+app.include_router(cache_router)
+app.include_router(database_router)
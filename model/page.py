@@ -0,0 +1,16 @@
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic.generics import GenericModel
+
+T = TypeVar("T")
+
+
+class Page(GenericModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[int] = None
+
+    @classmethod
+    def from_results(cls, results: List[T], limit: int) -> "Page[T]":
+        if len(results) > limit:
+            return cls(items=results[:limit], next_cursor=results[limit - 1].id)
+        return cls(items=results)
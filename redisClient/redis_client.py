@@ -1,6 +1,47 @@
-import redis
+import time
+
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
 
 from config.config import Config
+from repository import request_metrics
 
 config = Config()
-redis_client = redis.StrictRedis(host=config.REDIS_HOST, port=config.REDIS_PORT)
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        commands = len(self.command_stack)
+        started = time.monotonic()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            request_metrics.record_redis_commands(commands, (time.monotonic() - started) * 1000)
+
+
+class InstrumentedRedis(redis.StrictRedis):
+    async def execute_command(self, *args, **options):
+        started = time.monotonic()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            request_metrics.record_redis_commands(1, (time.monotonic() - started) * 1000)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+if config.RUNTIME_PROFILE == "local":
+    import fakeredis
+
+    redis_pool = fakeredis.FakeAsyncRedis().connection_pool
+else:
+    redis_pool = redis.BlockingConnectionPool(
+        host=config.REDIS_HOST,
+        port=config.REDIS_PORT,
+        max_connections=config.REDIS_MAX_CONNECTIONS,
+        timeout=config.REDIS_POOL_TIMEOUT,
+        socket_timeout=config.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=config.REDIS_CONNECT_TIMEOUT,
+    )
+redis_client = InstrumentedRedis(connection_pool=redis_pool)
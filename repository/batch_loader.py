@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List
+
+
+class BatchLoader:
+    def __init__(self, batch_load: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]):
+        self.batch_load = batch_load
+        self._results: Dict[Hashable, asyncio.Future] = {}
+        self._pending: List[Hashable] = []
+
+    def load(self, key: Hashable) -> asyncio.Future:
+        future = self._results.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._results[key] = future
+            self._pending.append(key)
+            if len(self._pending) == 1:
+                loop.call_soon(self._schedule_dispatch)
+        return future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        keys = list(dict.fromkeys(keys))
+        values = await asyncio.gather(*[self.load(key) for key in keys])
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def clear(self):
+        self._results = {key: future for key, future in self._results.items() if not future.done()}
+
+    def _schedule_dispatch(self):
+        asyncio.ensure_future(self._dispatch())
+
+    async def _dispatch(self):
+        keys, self._pending = self._pending, []
+        futures = [self._results[key] for key in keys]
+        try:
+            values = await self.batch_load(keys)
+        except Exception as e:
+            for key, future in zip(keys, futures):
+                self._results.pop(key, None)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in zip(keys, futures):
+            if not future.done():
+                future.set_result(values.get(key))
@@ -0,0 +1,118 @@
+import json
+import struct
+import zlib
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+from typing import Any, List, Optional, Type, Union
+
+import msgpack
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST
+
+from config.config import Config
+
+config = Config()
+
+FORMAT_VERSION = 1
+HEADER = struct.Struct(">BBIB")
+SINGLE = 0
+MANY = 1
+
+
+class JsonCodec:
+    codec_id = 1
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    codec_id = 2
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+CODECS = {"json": JsonCodec, "msgpack": MsgpackCodec}
+CODECS_BY_ID = {codec.codec_id: codec for codec in CODECS.values()}
+schema_versions = {}
+
+
+def schema_version(model_cls: Type[BaseModel]) -> int:
+    version = schema_versions.get(model_cls)
+    if version is None:
+        signature = f"{model_cls.__name__}:{config.CACHE_SCHEMA_VERSION}:" + ",".join(
+            f"{name}={field.outer_type_}" for name, field in model_cls.__fields__.items()
+        )
+        version = zlib.crc32(signature.encode())
+        schema_versions[model_cls] = version
+    return version
+
+
+def to_primitive(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return [to_primitive(getattr(value, name)) for name in value.__fields__]
+    if isinstance(value, list):
+        return [to_primitive(item) for item in value]
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def from_primitive(type_: Any, value: Any) -> Any:
+    if value is None or not isinstance(type_, type):
+        return value
+    if issubclass(type_, BaseModel):
+        return construct(type_, value)
+    if issubclass(type_, Decimal):
+        return Decimal(value)
+    if issubclass(type_, date):
+        return date.fromisoformat(value)
+    if issubclass(type_, Enum):
+        return type_(value)
+    return value
+
+
+def construct(model_cls: Type[BaseModel], values: list) -> BaseModel:
+    fields = {}
+    for (name, field), value in zip(model_cls.__fields__.items(), values):
+        if field.shape == SHAPE_LIST and value is not None:
+            fields[name] = [from_primitive(field.type_, item) for item in value]
+        else:
+            fields[name] = from_primitive(field.type_, value)
+    return model_cls.construct(**fields)
+
+
+def encode(model_cls: Type[BaseModel], value: Union[BaseModel, List[BaseModel]]) -> bytes:
+    codec = CODECS[config.CACHE_CODEC]
+    kind = MANY if isinstance(value, list) else SINGLE
+    header = HEADER.pack(FORMAT_VERSION, codec.codec_id, schema_version(model_cls), kind)
+    return header + codec.dumps(to_primitive(value))
+
+
+def decode(model_cls: Type[BaseModel], data: bytes) -> Optional[Union[BaseModel, List[BaseModel]]]:
+    if len(data) < HEADER.size:
+        return None
+    format_version, codec_id, version, kind = HEADER.unpack_from(data)
+    codec = CODECS_BY_ID.get(codec_id)
+    if format_version != FORMAT_VERSION or codec is None or version != schema_version(model_cls):
+        return None
+    payload = codec.loads(data[HEADER.size:])
+    if kind == MANY:
+        return [construct(model_cls, values) for values in payload]
+    return construct(model_cls, payload)
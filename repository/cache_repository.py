@@ -1,32 +1,374 @@
-from typing import Optional
+import asyncio
+import logging
+import math
+import random
+import re
+import time
+import uuid
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
 
 from redisClient.redis_client import redis_client
 from config.config import Config
+from repository.local_cache import LocalCache
 
 config = Config()
+logger = logging.getLogger(__name__)
+local_cache = LocalCache(config.LOCAL_CACHE_MAX_SIZE, config.LOCAL_CACHE_TTL)
+redis_stats = {"hits": 0, "misses": 0}
 
+INVALIDATION_CHANNEL = "cache_invalidation"
+NEGATIVE_ENTRY = b"\x00"
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+# Versions come from one shared counter, so a namespace whose version key expired and fell back to 0 never
+# reuses a version number that entries still in Redis were written under.
+VERSION_COUNTER_KEY = "version_counter"
+BUMP_VERSIONS_SCRIPT = """
+local version = redis.call("INCR", KEYS[1])
+for i = 2, #KEYS do
+    redis.call("SET", KEYS[i], version, "EX", ARGV[1])
+end
+return version
+"""
 
-def get_cache_entity(key: str) -> Optional[str]:
-    if redis_client.exists(key):
-        return redis_client.get(key)
-    else:
+in_flight_loads: Dict[str, asyncio.Task] = {}
+
+
+def key_namespace(key: str) -> str:
+    return re.sub(r"_\d+$", "", key.split(":", 1)[0])
+
+
+def jittered_ttl(ttl: int) -> int:
+    return ttl + random.randint(0, int(ttl * config.CACHE_TTL_JITTER))
+
+
+def entity_ttl(key: str) -> int:
+    return jittered_ttl(config.CACHE_NAMESPACE_TTLS.get(key_namespace(key), config.REDIS_TTL))
+
+
+def longest_entry_ttl() -> int:
+    longest_ttl = max(config.REDIS_TTL, config.CATALOG_MAX_STALENESS, *config.CACHE_NAMESPACE_TTLS.values())
+    return math.ceil(longest_ttl * (1 + config.CACHE_TTL_JITTER))
+
+
+def version_ttl() -> int:
+    return max(config.CACHE_VERSION_TTL, math.ceil(longest_entry_ttl() + config.LOCAL_CACHE_TTL) + 1)
+
+
+# Only recently loaded keys are refreshed early, so their load times live in a bounded LRU that forgets a key
+# once no cache entry for it can still be alive.
+load_durations = LocalCache(config.LOCAL_CACHE_MAX_SIZE, longest_entry_ttl())
+
+
+async def get_cache_entity(key: str) -> Optional[bytes]:
+    value = await redis_client.get(key)
+    redis_stats["hits" if value is not None else "misses"] += 1
+    return value
+
+
+async def create_cache_entity(key: str, value: Union[str, bytes]):
+    await redis_client.set(key, value, ex=entity_ttl(key), nx=True)
+
+
+async def set_cache_entity(key: str, value: Union[str, bytes]):
+    await redis_client.set(key, value, ex=entity_ttl(key))
+
+
+async def set_negative_entity(key: str):
+    await redis_client.set(key, NEGATIVE_ENTRY, ex=jittered_ttl(config.NEGATIVE_CACHE_TTL))
+
+
+def is_negative_entry(value: Optional[bytes]) -> bool:
+    return value == NEGATIVE_ENTRY
+
+
+async def remove_cache_entity(key: str):
+    await redis_client.delete(key)
+
+
+async def is_key_exists(key: str) -> bool:
+    return bool(await redis_client.exists(key))
+
+
+async def get_many(keys: List[str]) -> List[Optional[bytes]]:
+    if not keys:
+        return []
+    values = await redis_client.mget(keys)
+    hits = sum(1 for value in values if value is not None)
+    redis_stats["hits"] += hits
+    redis_stats["misses"] += len(values) - hits
+    return values
+
+
+async def set_many(entities: Dict[str, Union[str, bytes]], ttl: Optional[int] = None, jitter: bool = True):
+    if not entities:
+        return
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key, value in entities.items():
+            if ttl is None:
+                pipe.set(key, value, ex=entity_ttl(key))
+            else:
+                pipe.set(key, value, ex=jittered_ttl(ttl) if jitter else ttl)
+        await pipe.execute()
+
+
+async def get_or_load(
+        key: str,
+        loader: Callable[[], Awaitable[Optional[bytes]]],
+        decoder: Optional[Callable[[bytes], Any]] = None
+) -> Optional[Any]:
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.get(key)
+        pipe.pttl(key)
+        value, ttl_ms = await pipe.execute()
+
+    if is_negative_entry(value):
+        redis_stats["hits"] += 1
+        return None
+    if value is not None:
+        decoded = decoder(value) if decoder else value
+        if decoded is not None:
+            redis_stats["hits"] += 1
+            if should_refresh_early(key, ttl_ms):
+                load_once(key, loader)
+            return decoded
+
+    redis_stats["misses"] += 1
+    value = await asyncio.shield(load_once(key, loader))
+    if value is None or is_negative_entry(value):
         return None
+    if decoder is None:
+        return value
+    decoded = decoder(value)
+    if decoded is None:
+        value = await loader()
+        decoded = decoder(value) if value is not None else None
+    return decoded
+
+
+def should_refresh_early(key: str, ttl_ms: int) -> bool:
+    if ttl_ms <= 0:
+        return False
+    load_duration = load_durations.get(key)
+    if load_duration is None:
+        load_duration = config.CACHE_LOCK_POLL_INTERVAL
+    return load_duration * config.CACHE_EARLY_REFRESH_BETA * -math.log(1.0 - random.random()) >= ttl_ms / 1000
+
+
+def load_once(key: str, loader: Callable[[], Awaitable[Optional[bytes]]]) -> asyncio.Task:
+    task = in_flight_loads.get(key)
+    if task is None:
+        task = asyncio.ensure_future(load_with_lock(key, loader))
+        in_flight_loads[key] = task
+        task.add_done_callback(lambda done: finish_load(key, done))
+    return task
+
+
+def load_many_once(
+        keys: List[str],
+        loader: Callable[[List[str]], Awaitable[Dict[str, Optional[bytes]]]]
+) -> List[asyncio.Task]:
+    missing_keys = [key for key in keys if key not in in_flight_loads]
+    if missing_keys:
+        batch = asyncio.ensure_future(load_and_store_many(missing_keys, loader))
+        for key in missing_keys:
+            task = asyncio.ensure_future(batch_value(batch, key))
+            in_flight_loads[key] = task
+            task.add_done_callback(partial(finish_load, key))
+    return [in_flight_loads[key] for key in keys]
+
+
+async def batch_value(batch: asyncio.Task, key: str) -> Optional[bytes]:
+    return (await batch).get(key)
+
+
+async def load_and_store_many(
+        keys: List[str],
+        loader: Callable[[List[str]], Awaitable[Dict[str, Optional[bytes]]]]
+) -> Dict[str, Optional[bytes]]:
+    started = time.monotonic()
+    values = await loader(keys)
+    load_duration = time.monotonic() - started
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            load_durations.set(key, load_duration)
+            value = values.get(key)
+            if value is not None:
+                pipe.set(key, value, ex=entity_ttl(key))
+            else:
+                pipe.set(key, NEGATIVE_ENTRY, ex=jittered_ttl(config.NEGATIVE_CACHE_TTL))
+        await pipe.execute()
+    return values
+
+
+def finish_load(key: str, task: asyncio.Task):
+    in_flight_loads.pop(key, None)
+    if not task.cancelled():
+        task.exception()
+
+
+async def acquire_lock(lock_key: str, timeout: float) -> Optional[str]:
+    token = uuid.uuid4().hex
+    if await redis_client.set(lock_key, token, px=int(timeout * 1000), nx=True):
+        return token
+    return None
+
+
+async def release_lock(lock_key: str, token: str):
+    await redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+
+async def load_with_lock(key: str, loader: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[bytes]:
+    lock_key = f"lock:{key}"
+    token = await acquire_lock(lock_key, config.CACHE_LOCK_TIMEOUT)
+    if token:
+        try:
+            started = time.monotonic()
+            value = await loader()
+            load_durations.set(key, time.monotonic() - started)
+            if value is not None:
+                await redis_client.set(key, value, ex=entity_ttl(key))
+            else:
+                await set_negative_entity(key)
+            return value
+        finally:
+            await release_lock(lock_key, token)
+
+    deadline = time.monotonic() + config.CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(config.CACHE_LOCK_POLL_INTERVAL)
+        value = await redis_client.get(key)
+        if value is not None:
+            return value
+        if not await redis_client.exists(lock_key):
+            break
+    return await loader()
+
+
+def get_local_entity(key: str) -> Optional[Any]:
+    return local_cache.get(key)
+
+
+def set_local_entity(key: str, value: Any):
+    local_cache.set(key, value)
+
+
+async def get_namespace_version(namespace: str) -> int:
+    version_key = f"version:{namespace}"
+    version = local_cache.get(version_key)
+    if version is None:
+        version = int(await redis_client.get(version_key) or 0)
+        local_cache.set(version_key, version)
+    return version
+
+
+def versioned_key(namespace: str, version: int, key: str) -> str:
+    return f"{namespace}:v{version}:{key}"
+
+
+async def namespaced_key(namespace: str, key: str) -> str:
+    version = await get_namespace_version(namespace)
+    return versioned_key(namespace, version, key)
+
+
+async def bump_namespace_version(*namespaces: str):
+    await evict([], list(namespaces))
+
+
+async def evict(keys: List[str], namespaces: List[str]):
+    if not keys and not namespaces:
+        return
+    version_keys = [f"version:{namespace}" for namespace in namespaces]
+    for version_key in version_keys:
+        local_cache.remove(version_key)
+    async with redis_client.pipeline(transaction=False) as pipe:
+        if keys:
+            pipe.delete(*keys)
+        if version_keys:
+            pipe.eval(BUMP_VERSIONS_SCRIPT, len(version_keys) + 1, VERSION_COUNTER_KEY, *version_keys, version_ttl())
+        for version_key in version_keys:
+            pipe.publish(INVALIDATION_CHANNEL, version_key)
+        await pipe.execute()
+
+
+async def listen_for_invalidations():
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            local_cache.clear()
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message:
+                    local_cache.remove(message["data"].decode())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            local_cache.clear()
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
 
 
-def create_cache_entity(key: str, value: str):
-    if not redis_client.exists(key):
-        redis_client.setex(key, config.REDIS_TTL, value)
+def get_cache_stats() -> dict:
+    redis_lookups = redis_stats["hits"] + redis_stats["misses"]
+    return {
+        "local": local_cache.stats(),
+        "redis": {
+            **redis_stats,
+            "hit_ratio": redis_stats["hits"] / redis_lookups if redis_lookups else 0.0,
+        },
+    }
 
 
-def update_cache_entity(key: str, value: str):
-    if redis_client.exists(key):
-        redis_client.setex(key, config.REDIS_TTL, value)
+async def check_memory_policy():
+    if config.RUNTIME_PROFILE == "local":
+        return
+    try:
+        memory_config = await redis_client.config_get("maxmemory*")
+    except Exception:
+        logger.warning("Unable to read Redis memory configuration", exc_info=True)
+        return
+    max_memory = int(memory_config.get("maxmemory", 0))
+    policy = memory_config.get("maxmemory-policy")
+    if max_memory == 0:
+        logger.warning("Redis maxmemory is unbounded, expected at most %d bytes", config.REDIS_MEMORY_BUDGET)
+    elif max_memory > config.REDIS_MEMORY_BUDGET:
+        logger.warning("Redis maxmemory %d exceeds the budget of %d bytes", max_memory, config.REDIS_MEMORY_BUDGET)
+    if policy not in config.REDIS_EVICTION_POLICIES:
+        logger.warning(
+            "Redis maxmemory-policy is %s, expected one of %s so keys without a TTL are never evicted",
+            policy, config.REDIS_EVICTION_POLICIES
+        )
 
 
-def remove_cache_entity(key: str):
-    if redis_client.exists(key):
-        redis_client.delete(key)
+async def get_namespace_memory_usage() -> dict:
+    usage = {}
+    sampled_keys = []
+    async for key in redis_client.scan_iter(count=1000):
+        sampled_keys.append(key)
+        if len(sampled_keys) >= config.CACHE_MEMORY_SAMPLE_SIZE:
+            break
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key in sampled_keys:
+            pipe.memory_usage(key)
+        sizes = await pipe.execute(raise_on_error=False)
+    for key, size in zip(sampled_keys, sizes):
+        namespace_usage = usage.setdefault(key_namespace(key.decode()), {"keys": 0, "bytes": 0})
+        namespace_usage["keys"] += 1
+        namespace_usage["bytes"] += size if isinstance(size, int) else 0
+    return {
+        "total_keys": await redis_client.dbsize(),
+        "sampled_keys": len(sampled_keys),
+        "namespaces": usage,
+    }
 
 
-def is_key_exists(key: str) -> bool:
-    return redis_client.exists(key)
+async def close():
+    await redis_client.aclose()
+    await redis_client.connection_pool.disconnect()
@@ -1,6 +1,205 @@
+import asyncio
+import bisect
+import functools
+import time
+from contextvars import ContextVar
+from typing import AsyncIterator, List, Optional
+
+import aiomysql
 from databases import Database
+from sqlalchemy.dialects.mysql import pymysql
 
 from config.config import Config
+from repository import cache_repository, local_schema, request_metrics
 
 config = Config()
-database = Database(config.DATABASE_URL)
+
+WAIT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000]
+pool_wait_stats = {"acquired": 0, "timeouts": 0, "total_wait_ms": 0.0, "buckets": [0] * (len(WAIT_BUCKETS_MS) + 1)}
+
+
+def is_local_profile() -> bool:
+    return config.RUNTIME_PROFILE == "local"
+
+
+def database_url() -> str:
+    return f"sqlite:///{config.LOCAL_DATABASE_PATH}" if is_local_profile() else config.DATABASE_URL
+
+
+def pool_options() -> dict:
+    if not database_url().startswith("mysql"):
+        return {}
+    return {
+        "min_size": config.DATABASE_MIN_POOL_SIZE,
+        "max_size": config.DATABASE_MAX_POOL_SIZE,
+        "pool_recycle": config.DATABASE_POOL_RECYCLE,
+    }
+
+
+database = Database(database_url(), **pool_options())
+replica = (
+    Database(config.DATABASE_REPLICA_URL, **pool_options())
+    if config.DATABASE_REPLICA_URL and not is_local_profile() else database
+)
+mysql_dialect = pymysql.dialect(paramstyle="pyformat")
+pinned_to_primary: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+
+
+def timed_query(method):
+    @functools.wraps(method)
+    async def timed(*args, **kwargs):
+        started = time.monotonic()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            request_metrics.record_queries(1, (time.monotonic() - started) * 1000)
+
+    return timed
+
+
+def instrument_queries(handle: Database):
+    for name in ("fetch_all", "fetch_one", "fetch_val", "execute", "execute_many"):
+        setattr(handle, name, timed_query(getattr(handle, name)))
+
+
+instrument_queries(database)
+if replica is not database:
+    instrument_queries(replica)
+
+
+def record_pool_wait(wait_ms: float):
+    pool_wait_stats["acquired"] += 1
+    pool_wait_stats["total_wait_ms"] += wait_ms
+    pool_wait_stats["buckets"][bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+
+def instrument_pool():
+    pool = getattr(database._backend, "_pool", None)
+    if not hasattr(pool, "_acquire"):
+        return
+    acquire = pool._acquire
+
+    async def timed_acquire():
+        started = time.monotonic()
+        try:
+            connection = await asyncio.wait_for(acquire(), config.DATABASE_ACQUIRE_TIMEOUT)
+        except asyncio.TimeoutError:
+            pool_wait_stats["timeouts"] += 1
+            raise
+        record_pool_wait((time.monotonic() - started) * 1000)
+        return connection
+
+    pool._acquire = timed_acquire
+
+
+def enforce_sqlite_foreign_keys():
+    pool = database._backend._pool
+    acquire = pool.acquire
+
+    async def acquire_with_foreign_keys():
+        connection = await acquire()
+        await connection.execute("PRAGMA foreign_keys = ON")
+        return connection
+
+    pool.acquire = acquire_with_foreign_keys
+
+
+async def connect():
+    await database.connect()
+    if replica is not database:
+        await replica.connect()
+    if is_local_profile():
+        enforce_sqlite_foreign_keys()
+        await local_schema.apply_local_schema(database)
+    instrument_pool()
+
+
+async def disconnect():
+    await database.disconnect()
+    if replica is not database:
+        await replica.disconnect()
+
+
+def primary_pin_key(scope: str) -> str:
+    return f"primary_pin:{scope}"
+
+
+def user_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+async def pin_to_primary(*scopes: str):
+    pinned_to_primary.set(True)
+    if replica is not database and scopes:
+        await cache_repository.set_many(
+            {primary_pin_key(scope): b"1" for scope in scopes}, ttl=config.REPLICA_PIN_SECONDS, jitter=False
+        )
+
+
+async def reader(scope: Optional[str] = None) -> Database:
+    if replica is database or pinned_to_primary.get():
+        return database
+    if scope is not None and await cache_repository.is_key_exists(primary_pin_key(scope)):
+        return database
+    return replica
+
+
+# Reads without a scope only honour a pin set earlier in the same request. Reads by id whose owner is not known
+# use the primary directly instead.
+async def read_one(query, scope: Optional[str] = None):
+    return await (await reader(scope)).fetch_one(query)
+
+
+async def read_all(query, scope: Optional[str] = None) -> list:
+    return await (await reader(scope)).fetch_all(query)
+
+
+def get_pool_stats() -> dict:
+    pool = getattr(database._backend, "_pool", None)
+    acquired = pool_wait_stats["acquired"]
+    stats = {
+        "acquired": acquired,
+        "timeouts": pool_wait_stats["timeouts"],
+        "average_wait_ms": pool_wait_stats["total_wait_ms"] / acquired if acquired else 0.0,
+        "wait_histogram_ms": {
+            **{f"<={bound}": count for bound, count in zip(WAIT_BUCKETS_MS, pool_wait_stats["buckets"])},
+            f">{WAIT_BUCKETS_MS[-1]}": pool_wait_stats["buckets"][-1],
+        },
+    }
+    if hasattr(pool, "freesize"):
+        stats.update({
+            "min_size": pool.minsize,
+            "max_size": pool.maxsize,
+            "size": pool.size,
+            "in_use": pool.size - pool.freesize,
+            "idle": pool.freesize,
+        })
+    return stats
+
+
+async def iterate_unbuffered(query) -> AsyncIterator[List[dict]]:
+    request_metrics.record_queries(1, 0.0)
+    async with replica.connection() as connection:
+        raw_connection = connection.raw_connection
+        if not isinstance(raw_connection, aiomysql.Connection):
+            rows = []
+            async for record in connection.iterate(query):
+                rows.append(dict(record))
+                if len(rows) >= config.STREAM_FETCH_SIZE:
+                    yield rows
+                    rows = []
+            if rows:
+                yield rows
+            return
+
+        cursor = await raw_connection.cursor(aiomysql.SSDictCursor)
+        try:
+            compiled = query.compile(dialect=mysql_dialect)
+            await cursor.execute(compiled.string, compiled.construct_params())
+            while True:
+                rows = await cursor.fetchmany(config.STREAM_FETCH_SIZE)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            await cursor.close()
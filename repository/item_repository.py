@@ -1,102 +1,211 @@
-import json
-from typing import Optional, List
-
+import asyncio
+import logging
+import random
+from contextvars import ContextVar
+from functools import partial
+from typing import Optional, List, Dict
+
+from config.config import Config
 from model.item import Item
-from repository import cache_repository
-from repository.database import database
+from repository import cache_repository, cache_codec, statements
+from repository.batch_loader import BatchLoader
+from repository.database import database, pin_to_primary, read_all, read_one
+
+config = Config()
+logger = logging.getLogger(__name__)
+
+CATALOG_NAMESPACE = "catalog"
 
 
-TABLE_NAME = "item"
+decode_item = partial(cache_codec.decode, Item)
+request_item_loader: ContextVar[Optional[BatchLoader]] = ContextVar("request_item_loader", default=None)
 
 
 async def get_item_by_id(item_id: int) -> Optional[Item]:
-    cache_key = f"item_id_{item_id}"
-    cached_item = cache_repository.get_cache_entity(cache_key)
-    if cached_item:
-        item_data = json.loads(cached_item)
-        return Item(**item_data)
-
-    query = f"SELECT * FROM {TABLE_NAME} WHERE id=:item_id"
-    result = await database.fetch_one(query, values={"item_id": item_id})
-    if result:
-        item = Item(**result)
-        cache_repository.create_cache_entity(cache_key, item.json())
-        return item
-    else:
-        return None
+    cache_key = await cache_repository.namespaced_key(CATALOG_NAMESPACE, f"item_id_{item_id}")
+    local_item = cache_repository.get_local_entity(cache_key)
+    if local_item:
+        return local_item
+
+    async def load_item() -> Optional[bytes]:
+        result = await read_one(statements.ITEM_BY_ID(item_id=item_id), CATALOG_NAMESPACE)
+        return cache_codec.encode(Item, Item(**result)) if result else None
+
+    item = await cache_repository.get_or_load(cache_key, load_item, decode_item)
+    if item:
+        cache_repository.set_local_entity(cache_key, item)
+    return item
+
+
+async def get_items_by_ids(item_ids: List[int]) -> Dict[int, Item]:
+    item_ids = list(dict.fromkeys(item_ids))
+    if len(item_ids) == 1:
+        item = await get_item_by_id(item_ids[0])
+        return {item_ids[0]: item} if item else {}
+
+    items = {}
+    missing_ids = []
+    version = await cache_repository.get_namespace_version(CATALOG_NAMESPACE)
+
+    def cache_key(item_id: int) -> str:
+        return cache_repository.versioned_key(CATALOG_NAMESPACE, version, f"item_id_{item_id}")
+
+    for item_id in item_ids:
+        local_item = cache_repository.get_local_entity(cache_key(item_id))
+        if local_item:
+            items[item_id] = local_item
+        else:
+            missing_ids.append(item_id)
+
+    cached_items = await cache_repository.get_many([cache_key(item_id) for item_id in missing_ids])
+    db_ids = {}
+    for item_id, cached_item in zip(missing_ids, cached_items):
+        if cache_repository.is_negative_entry(cached_item):
+            continue
+        item = decode_item(cached_item) if cached_item else None
+        if item:
+            cache_repository.set_local_entity(cache_key(item_id), item)
+            items[item_id] = item
+        else:
+            db_ids[cache_key(item_id)] = item_id
+
+    async def load_items(keys: List[str]) -> Dict[str, Optional[bytes]]:
+        results = await read_all(statements.ITEMS_BY_IDS(item_ids=[db_ids[key] for key in keys]), CATALOG_NAMESPACE)
+        encoded_items = {result["id"]: cache_codec.encode(Item, Item(**result)) for result in results}
+        return {key: encoded_items.get(db_ids[key]) for key in keys}
+
+    if db_ids:
+        values = await asyncio.gather(*[
+            asyncio.shield(task) for task in cache_repository.load_many_once(list(db_ids), load_items)
+        ])
+        for (key, item_id), value in zip(db_ids.items(), values):
+            if value is None or cache_repository.is_negative_entry(value):
+                continue
+            item = decode_item(value)
+            if item:
+                cache_repository.set_local_entity(key, item)
+                items[item_id] = item
+    return items
+
+
+def start_request_item_loader():
+    request_item_loader.set(BatchLoader(get_items_by_ids))
+
+
+def clear_request_item_loader():
+    loader = request_item_loader.get()
+    if loader is not None:
+        loader.clear()
+
+
+async def load_item(item_id: int) -> Optional[Item]:
+    loader = request_item_loader.get()
+    if loader is None:
+        return await get_item_by_id(item_id)
+    return await loader.load(item_id)
+
+
+async def load_items(item_ids: List[int]) -> Dict[int, Item]:
+    loader = request_item_loader.get()
+    if loader is None:
+        return await get_items_by_ids(item_ids)
+    return await loader.load_many(item_ids)
 
 
 async def get_item_by_name(item_name: str):
-    query = f"SELECT * FROM {TABLE_NAME} WHERE name=:item_name"
-    result = await database.fetch_one(query, values={"item_name": item_name})
+    result = await read_one(statements.ITEM_BY_NAME(item_name=item_name), CATALOG_NAMESPACE)
     return Item(**result) if result else None
 
 
-async def get_all_items() -> List[Item]:
-    cache_key = "all_items"
-    cached_items = cache_repository.get_cache_entity(cache_key)
-    if cached_items:
-        return [Item(**item) for item in json.loads(cached_items)]
-    query = f"SELECT * FROM {TABLE_NAME}"
-    results = await database.fetch_all(query)
-    if results:
-        items = [Item(**result) for result in results]
-        cache_repository.create_cache_entity(
-            cache_key, json.dumps([json.loads(item.json()) for item in items])
-        )
-        return items
+def items_page_key(limit: int, after_id: int) -> str:
+    return f"items_after_{after_id}_limit_{limit}"
+
+
+async def get_all_items(limit: int, after_id: int = 0) -> List[Item]:
+    cache_key = await cache_repository.namespaced_key(CATALOG_NAMESPACE, items_page_key(limit, after_id))
+    local_items = cache_repository.get_local_entity(cache_key)
+    if local_items:
+        return list(local_items)
+
+    async def load_items() -> Optional[bytes]:
+        results = await read_all(statements.ITEMS_PAGE(after_id=after_id, limit=limit), CATALOG_NAMESPACE)
+        if not results:
+            return None
+        return cache_codec.encode(Item, [Item(**result) for result in results])
+
+    items = await cache_repository.get_or_load(cache_key, load_items, decode_item)
+    if items:
+        cache_repository.set_local_entity(cache_key, items)
+        return list(items)
 
     return []
 
 
-async def create_item(item: Item) -> int:
-    query = f"""
-        INSERT INTO {TABLE_NAME} (name, price, item_stock)
-        VALUES (:name, :price, :item_stock)
-    """
-    values = {
-        "name": item.name,
-        "price": item.price,
-        "item_stock": item.item_stock
-    }
-    async with database.transaction():
-        await database.execute(query, values)
-        last_record_id = await database.fetch_one("SELECT LAST_INSERT_ID()")
-
-    item_cache_data = {
-        "id": last_record_id["id"],
-        "name": item.name,
-        "price": item.price,
-        "item_stock": item.item_stock
+async def warm_catalog_cache():
+    # Read the version first: if an item changes while the rows load, the bump moves readers to a newer version
+    # and these rows are written under the old one instead of overwriting fresh entries.
+    version = await cache_repository.get_namespace_version(CATALOG_NAMESPACE)
+    results = await read_all(statements.ITEMS(after_id=0), CATALOG_NAMESPACE)
+    items = [Item(**result) for result in results]
+    entities = {
+        cache_repository.versioned_key(CATALOG_NAMESPACE, version, f"item_id_{item.id}"): cache_codec.encode(Item, item)
+        for item in items
     }
-    cache_repository.create_cache_entity(f"item_id_{last_record_id['id']}", json.dumps(item_cache_data))
-    cache_repository.remove_cache_entity("all_items")
-    return last_record_id["id"]
+    if items:
+        first_page_key = items_page_key(config.PAGE_SIZE_DEFAULT + 1, 0)
+        entities[cache_repository.versioned_key(CATALOG_NAMESPACE, version, first_page_key)] = cache_codec.encode(
+            Item, items[:config.PAGE_SIZE_DEFAULT + 1]
+        )
+    await cache_repository.set_many(entities, ttl=config.CATALOG_MAX_STALENESS)
 
 
-async def update_item(item_id: int, item: Item):
-    query = f"""
-        UPDATE {TABLE_NAME}
-        SET name = :name, price = :price, item_stock = :item_stock
-        WHERE id = :item_id
-    """
-    values = {
-        "item_id": item_id,
-        "name": item.name,
-        "price": item.price,
-        "item_stock": item.item_stock
-    }
-    await database.execute(query, values)
+async def refresh_catalog_cache():
+    while True:
+        await asyncio.sleep(config.CATALOG_REFRESH_INTERVAL + random.uniform(0, config.CATALOG_REFRESH_JITTER))
+        try:
+            if await cache_repository.acquire_lock("lock:catalog_refresh", config.CATALOG_REFRESH_INTERVAL / 2):
+                await warm_catalog_cache()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Catalog cache refresh failed")
+
+
+async def create_item(item: Item) -> int:
+    item_id = await database.execute(
+        statements.INSERT_ITEM(name=item.name, price=item.price, item_stock=item.item_stock)
+    )
+    await pin_to_primary(CATALOG_NAMESPACE)
+    await cache_repository.bump_namespace_version(CATALOG_NAMESPACE)
+    clear_request_item_loader()
+    item_cache_data = Item(id=item_id, name=item.name, price=item.price, item_stock=item.item_stock)
+    await cache_repository.create_cache_entity(
+        await cache_repository.namespaced_key(CATALOG_NAMESPACE, f"item_id_{item_id}"),
+        cache_codec.encode(Item, item_cache_data)
+    )
+    return item_id
 
-    cache_key = f"item_id_{item_id}"
-    item_cache_data = item.json()
-    cache_repository.update_cache_entity(cache_key, item_cache_data)
-    cache_repository.remove_cache_entity("all_items")
 
+async def update_item(item_id: int, item: Item):
+    await database.execute(
+        statements.UPDATE_ITEM(item_id=item_id, name=item.name, price=item.price, item_stock=item.item_stock)
+    )
+    await pin_to_primary(CATALOG_NAMESPACE)
+    await cache_repository.bump_namespace_version(CATALOG_NAMESPACE)
+    clear_request_item_loader()
 
-async def delete_item_by_id(item_id: int):
-    cache_key = f"item_id_{item_id}"
-    cache_repository.remove_cache_entity(cache_key)
-    cache_repository.remove_cache_entity("all_items")
-    query = f"DELETE FROM {TABLE_NAME} WHERE id=:item_id"
-    await database.execute(query, values={"item_id": item_id})
+
+async def delete_item_by_id(item_id: int) -> List[int]:
+    async with database.transaction():
+        temp_orders = await database.fetch_all(statements.TEMP_ORDERS_WITH_ITEM(item_id=item_id))
+        await database.execute(statements.DELETE_FAVORITES_BY_ITEM_ID(item_id=item_id))
+        await database.execute(statements.DELETE_TEMP_ORDER_ITEMS_BY_ITEM_ID(item_id=item_id))
+        if temp_orders:
+            await database.execute(
+                statements.RECOMPUTE_TEMP_ORDER_TOTALS(order_ids=[order["id"] for order in temp_orders])
+            )
+        await database.execute(statements.DELETE_ITEM(item_id=item_id))
+    await pin_to_primary(CATALOG_NAMESPACE)
+    await cache_repository.bump_namespace_version(CATALOG_NAMESPACE)
+    clear_request_item_loader()
+    return list(dict.fromkeys(order["user_id"] for order in temp_orders))
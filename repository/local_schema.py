@@ -0,0 +1,49 @@
+import re
+from pathlib import Path
+from typing import List
+
+from databases import Database
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "resources" / "db-migrations"
+
+SQLITE_REWRITES = [
+    (re.compile(r"\bINT AUTO_INCREMENT PRIMARY KEY\b", re.IGNORECASE), "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r"\b(\w+) ENUM\(([^)]*)\)", re.IGNORECASE), r"\1 TEXT CHECK (\1 IN (\2))"),
+    (re.compile(r"\bINSERT IGNORE\b", re.IGNORECASE), "INSERT OR IGNORE"),
+]
+# Multi-table "DELETE alias FROM ... JOIN" only cleans up duplicates in existing data,
+# which a freshly created local database does not have.
+SKIPPED_STATEMENT = re.compile(r"^DELETE \w+ FROM\b", re.IGNORECASE)
+
+
+def migration_version(path: Path) -> str:
+    return re.match(r"migration_(\d+)_", path.name).group(1)
+
+
+def sqlite_statements(sql: str) -> List[str]:
+    statements = []
+    for statement in sql.split(";"):
+        statement = statement.strip()
+        if not statement or SKIPPED_STATEMENT.match(statement):
+            continue
+        for pattern, replacement in SQLITE_REWRITES:
+            statement = pattern.sub(replacement, statement)
+        statements.append(statement)
+    return statements
+
+
+async def run_script(handle: Database, path: Path):
+    for statement in sqlite_statements(path.read_text()):
+        await handle.execute(statement)
+
+
+async def apply_local_schema(handle: Database):
+    tables = await handle.fetch_all("SELECT name FROM sqlite_master WHERE type = 'table'")
+    if "users" not in {table["name"] for table in tables}:
+        await run_script(handle, MIGRATIONS_DIR / "init.sql")
+        applied = set()
+    else:
+        applied = {result["version"] for result in await handle.fetch_all("SELECT version FROM schema_migrations")}
+    for path in sorted(MIGRATIONS_DIR.glob("migration_*.sql")):
+        if migration_version(path) not in applied:
+            await run_script(handle, path)
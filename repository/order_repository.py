@@ -1,109 +1,141 @@
 from datetime import date
-from typing import List, Optional
-import json
+from decimal import Decimal
+from functools import partial
+from typing import AsyncIterator, Dict, List, Optional
 
 from model.order import Order
-from model.order_status import OrderStatus
-from repository import cache_repository, order_item_repository
-from repository.database import database
-from service import item_service
+from model.order_item import OrderItem
+from model.order_item_detail import OrderItemDetail
+from model.order_response import OrderResponse
+from repository import cache_repository, cache_codec, item_repository, order_item_repository, statements
+from repository.database import database, iterate_unbuffered, pin_to_primary, read_all, read_one, user_scope
 
-TABLE_NAME = "orders"
+decode_order = partial(cache_codec.decode, Order)
 
 
-async def cache_temp_order(order_id: int, order: Order):
-    order_items = await order_item_repository.get_order_items_by_order_id(order_id)
+def cart_namespace(user_id: int) -> str:
+    return f"cart_{user_id}"
+
+
+async def temp_order_cache_key(user_id: int) -> str:
+    return await cache_repository.namespaced_key(cart_namespace(user_id), f"temp_order_user_{user_id}")
+
+
+async def invalidate_cart(*user_ids: int):
+    await pin_to_primary(*[user_scope(user_id) for user_id in user_ids])
+    await cache_repository.bump_namespace_version(*[cart_namespace(user_id) for user_id in user_ids])
 
-    items = []
-    total_price = 0
-    for order_item in order_items:
-        item = await item_service.get_item_by_id(order_item.item_id)
-        if not item:
-            continue
-        items.append({
-            "item_id": item.id,
-            "name": item.name,
-            "price": item.price,
-            "quantity": order_item.quantity,
-            "item_stock": item.item_stock
-        })
-        total_price += item.price * order_item.quantity
-
-    cache_key = f"temp_order_user_{order.user_id}"
-    order_data = order.dict()
-    order_data.update({
-        "id": order_id,
-        "item": items,
-        "total_price": total_price,
-        "shipping_address": order.shipping_address,
-        "order_date": order.order_date.isoformat(),
-        "status": order.status.value
-    })
-
-    cache_repository.create_cache_entity(cache_key, json.dumps(order_data))
+
+async def cache_temp_order(order_id: int, order: Order):
+    cache_key = await temp_order_cache_key(order.user_id)
+    await cache_repository.set_cache_entity(cache_key, cache_codec.encode(Order, order.copy(update={"id": order_id})))
 
 
 async def get_order_by_id(order_id: int) -> Optional[Order]:
-    query = f"SELECT * FROM {TABLE_NAME} WHERE id=:order_id"
-    result = await database.fetch_one(query, values={"order_id": order_id})
+    result = await database.fetch_one(statements.ORDER_BY_ID(order_id=order_id))
     return Order(**result) if result else None
 
 
 async def get_order_by_user_id(user_id: int) -> List[Order]:
-    query = f"SELECT * FROM {TABLE_NAME} WHERE user_id=:user_id"
-    results = await database.fetch_all(query, values={"user_id": user_id})
+    results = await read_all(statements.ORDERS_BY_USER_ID(user_id=user_id), user_scope(user_id))
     return [Order(**result) for result in results]
 
 
+def build_order_responses(results: list) -> List[OrderResponse]:
+    orders = {}
+    totals = {}
+    for result in results:
+        order = orders.get(result["id"])
+        if order is None:
+            order = OrderResponse(
+                id=result["id"],
+                item=[],
+                total_price=0,
+                shipping_address=result["shipping_address"],
+                order_date=result["order_date"],
+                status=result["status"]
+            )
+            orders[result["id"]] = order
+            totals[result["id"]] = Decimal(0)
+        if result["item_id"] is None:
+            continue
+        if result["name"] is None:
+            raise ValueError(f"Item with ID {result['item_id']} not found.")
+        order.item.append(OrderItemDetail(
+            item_id=result["item_id"],
+            name=result["name"],
+            price=result["price"],
+            quantity=result["quantity"],
+            item_stock=result["item_stock"]
+        ))
+        totals[result["id"]] += Decimal(str(result["price"])) * result["quantity"]
+    for order_id, order in orders.items():
+        order.total_price = float(totals[order_id])
+    return list(orders.values())
+
+
+async def get_order_responses(query: statements.BoundStatement, scope: Optional[str] = None) -> List[OrderResponse]:
+    return build_order_responses(await read_all(query, scope))
+
+
+async def get_order_response_by_id(order_id: int, user_id: Optional[int] = None) -> Optional[OrderResponse]:
+    query = statements.ORDER_RESPONSES_BY_ID(order_id=order_id)
+    if user_id is None:
+        orders = build_order_responses(await database.fetch_all(query))
+    else:
+        orders = await get_order_responses(query, user_scope(user_id))
+    return orders[0] if orders else None
+
+
+async def get_order_responses_by_user_id(user_id: int) -> List[OrderResponse]:
+    return await get_order_responses(statements.ORDER_RESPONSES_BY_USER_ID(user_id=user_id), user_scope(user_id))
+
+
 async def get_temp_order_by_user_id(user_id: int) -> Optional[Order]:
-    cache_key = f"temp_order_user_{user_id}"
-    cached_order = cache_repository.get_cache_entity(cache_key)
-    if cached_order:
-        temp_order = json.loads(cached_order)
-        return Order(**temp_order)
-
-    query = f"""
-            SELECT * FROM {TABLE_NAME}
-            WHERE user_id = :user_id AND status = 'TEMP'
-            ORDER BY order_date DESC LIMIT 1
-        """
-    result = await database.fetch_one(query, values={"user_id": user_id})
+    cache_key = await temp_order_cache_key(user_id)
+    cached_order = await cache_repository.get_cache_entity(cache_key)
+    if cache_repository.is_negative_entry(cached_order):
+        return None
+    temp_order = decode_order(cached_order) if cached_order else None
+    if temp_order:
+        return temp_order
+
+    result = await read_one(statements.TEMP_ORDER_BY_USER_ID(user_id=user_id), user_scope(user_id))
     if result:
         order = Order(**result)
-        cache_repository.create_cache_entity(cache_key, order.json())
+        await cache_repository.create_cache_entity(cache_key, cache_codec.encode(Order, order))
         return order
+    await cache_repository.set_negative_entity(cache_key)
     return None
 
 
-async def get_all_temp_orders() -> List[Order]:
-    query = f"SELECT * FROM {TABLE_NAME} WHERE status = 'TEMP'"
-    results = await database.fetch_all(query)
+async def get_all_orders(limit: int, after_id: int = 0) -> List[Order]:
+    results = await read_all(statements.ORDERS_PAGE(after_id=after_id, limit=limit))
     return [Order(**result) for result in results]
 
 
-async def get_all_orders() -> List[Order]:
-    query = f"SELECT * FROM {TABLE_NAME}"
-    results = await database.fetch_all(query)
-    return [Order(**result) for result in results]
+async def iterate_all_orders() -> AsyncIterator[List[Order]]:
+    async for rows in iterate_unbuffered(statements.ORDERS_EXPORT()):
+        yield [Order(**row) for row in rows]
 
 
-async def create_order(order: Order) -> Optional[int]:
-    query = f"""
-        INSERT INTO {TABLE_NAME} (user_id, order_date, shipping_address, total_price, status)
-        VALUES (:user_id, :order_date, :shipping_address, :total_price, :status)
-    """
-    values = {
-        "user_id": order.user_id,
-        "order_date": order.order_date,
-        "shipping_address": order.shipping_address,
-        "total_price": order.total_price,
-        "status": order.status.value
-    }
+async def create_order(order: Order, item_quantities: Optional[Dict[int, int]] = None) -> Optional[int]:
+    query = statements.INSERT_ORDER(
+        user_id=order.user_id,
+        order_date=order.order_date,
+        shipping_address=order.shipping_address,
+        total_price=order.total_price,
+        status=order.status.value
+    )
 
     async with database.transaction():
-        await database.execute(query, values)
-        last_record_id = await database.fetch_one("SELECT LAST_INSERT_ID()")
-        order_id = last_record_id[0] if last_record_id else None
+        order_id = await database.execute(query)
+        if order_id and item_quantities:
+            await order_item_repository.create_order_items_bulk([
+                OrderItem(order_id=order_id, item_id=item_id, quantity=quantity)
+                for item_id, quantity in item_quantities.items()
+            ])
+    await pin_to_primary(user_scope(order.user_id))
 
     if order_id and order.status.value == "TEMP":
         await cache_temp_order(order_id, order)
@@ -112,69 +144,99 @@ async def create_order(order: Order) -> Optional[int]:
 
 
 async def update_order(order_id: int, order: Order):
-    query = f"""
-        UPDATE {TABLE_NAME}
-        SET user_id = :user_id, 
-        order_date = :order_date, 
-        shipping_address = :shipping_address, 
-        total_price = :total_price,
-        status = :status
-        WHERE id = :order_id
-    """
-    values = {
-        "order_id": order_id,
-        "user_id": order.user_id,
-        "order_date": order.order_date,
-        "shipping_address": order.shipping_address,
-        "total_price": order.total_price,
-        "status": order.status.value
-    }
-    await database.execute(query, values)
-
-
-async def update_temp_order(order_id: int, total_price: float):
-    query = f"""
-        UPDATE {TABLE_NAME}
-        SET total_price = :total_price
-        WHERE id = :order_id AND status = 'TEMP'
-    """
-    values = {
-        "total_price": total_price,
-        "order_id": order_id
-    }
-    await database.execute(query, values)
-    order = await get_order_by_id(order_id)
-    cache_key = f"temp_order_user_{order.user_id}"
-    if order and order.status.value == "TEMP":
-        cache_repository.update_cache_entity(cache_key, order.json())
-
-
-async def update_order_status(order_id: int, shipping_address: str, status: OrderStatus, date_close: date):
-    order = await get_order_by_id(order_id)
-    query = f"""
-        UPDATE {TABLE_NAME}
-        SET order_date = :order_date, shipping_address = :shipping_address, status = :status
-        WHERE id = :order_id
-    """
-    values = {
-        "order_id": order_id,
-        "order_date": date_close.isoformat(),
-        "shipping_address": shipping_address,
-        "status": status.value
-    }
-    await database.execute(query, values)
-    cache_key = f"temp_order_user_{order.user_id}"
-    cache_repository.remove_cache_entity(cache_key)
+    await database.execute(statements.UPDATE_ORDER(
+        order_id=order_id,
+        user_id=order.user_id,
+        order_date=order.order_date,
+        shipping_address=order.shipping_address,
+        total_price=order.total_price,
+        status=order.status.value
+    ))
+    await pin_to_primary(user_scope(order.user_id))
+
+
+async def set_temp_order_item(order_id: int, user_id: int, item_id: int, quantity: int) -> Optional[OrderResponse]:
+    async with database.transaction():
+        if quantity > 0:
+            await database.execute(
+                statements.UPSERT_ORDER_ITEM(order_id=order_id, item_id=item_id, quantity=quantity)
+            )
+        else:
+            await database.execute(statements.DELETE_ORDER_ITEM(order_id=order_id, item_id=item_id))
+        await database.execute(statements.RECOMPUTE_TEMP_ORDER_TOTAL(order_id=order_id))
+        carts = build_order_responses(
+            await database.fetch_all(statements.ORDER_RESPONSES_BY_ID(order_id=order_id))
+        )
+        cart = carts[0] if carts and carts[0].item else None
+        if carts and cart is None:
+            await database.execute(statements.DELETE_ORDER(order_id=order_id))
+
+    await invalidate_cart(user_id)
+    cache_key = await temp_order_cache_key(user_id)
+    if cart is None:
+        await cache_repository.set_negative_entity(cache_key)
+    else:
+        temp_order = Order(user_id=user_id, **cart.dict(exclude={"item"}))
+        await cache_repository.set_cache_entity(cache_key, cache_codec.encode(Order, temp_order))
+    return cart
+
+
+async def get_under_stock_lines(order_id: int) -> List[dict]:
+    results = await database.fetch_all(statements.UNDER_STOCK_LINES(order_id=order_id))
+    return [
+        {"item_id": result["item_id"], "item_name": result["name"], "required": result["quantity"],
+         "available": result["item_stock"]}
+        for result in results
+    ]
+
+
+class InsufficientStock(Exception):
+    pass
+
+
+async def close_order(order_id: int, user_id: int, shipping_address: str, date_close: date):
+    try:
+        async with database.transaction():
+            line_count = await database.fetch_val(statements.ORDER_LINE_COUNT(order_id=order_id))
+            await database.execute(statements.DECREMENT_ORDER_STOCK(order_id=order_id))
+            decremented = await database.fetch_val(statements.ROW_COUNT())
+            if decremented != line_count:
+                raise InsufficientStock()
+            await database.execute(statements.CLOSE_TEMP_ORDER(
+                order_id=order_id, order_date=date_close, shipping_address=shipping_address
+            ))
+            closed = await database.fetch_val(statements.ROW_COUNT())
+            if closed != 1:
+                raise ValueError(f"Open order with ID {order_id} not found")
+    except InsufficientStock:
+        # Report after the rollback, so lines that were decremented before the failure show their real stock.
+        raise ValueError(f"Insufficient stock for items: {await get_under_stock_lines(order_id)}") from None
+
+    await pin_to_primary(user_scope(user_id), item_repository.CATALOG_NAMESPACE)
+    await cache_repository.bump_namespace_version(item_repository.CATALOG_NAMESPACE, cart_namespace(user_id))
+    item_repository.clear_request_item_loader()
 
 
 async def delete_order_by_id(order_id: int):
     order = await get_order_by_id(order_id)
-    query = f"DELETE FROM {TABLE_NAME} WHERE id=:order_id"
-    await database.execute(query, values={"order_id": order_id})
-    cache_key = f"temp_order_user_{order.user_id}"
-    cache_repository.remove_cache_entity(cache_key)
+    await database.execute(statements.DELETE_ORDER(order_id=order_id))
+    await invalidate_cart(order.user_id)
 
 
 async def delete_order_by_user_id(user_id: int):
-    query = f"DELETE FROM {TABLE_NAME} WHERE user_id=:user_id"
-    await database.execute(query, values={"user_id": user_id})
+    await database.execute(statements.DELETE_ORDERS_BY_USER_ID(user_id=user_id))
+    await pin_to_primary(user_scope(user_id))
+
+
+async def delete_orders_by_user_id_in_chunks(user_id: int, chunk_size: int):
+    after_id = 0
+    while True:
+        results = await database.fetch_all(
+            statements.ORDER_IDS_BY_USER_ID_PAGE(user_id=user_id, after_id=after_id, limit=chunk_size)
+        )
+        if not results:
+            break
+        order_ids = [result["id"] for result in results]
+        await database.execute(statements.DELETE_ORDERS_BY_IDS(order_ids=order_ids))
+        after_id = order_ids[-1]
+    await pin_to_primary(user_scope(user_id))
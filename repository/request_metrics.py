@@ -0,0 +1,24 @@
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+request_metrics: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_metrics", default=None)
+
+
+def start_request_metrics() -> Dict[str, float]:
+    metrics = {"db_queries": 0, "db_ms": 0.0, "redis_commands": 0, "redis_ms": 0.0}
+    request_metrics.set(metrics)
+    return metrics
+
+
+def record_queries(count: int, elapsed_ms: float):
+    metrics = request_metrics.get()
+    if metrics is not None:
+        metrics["db_queries"] += count
+        metrics["db_ms"] += elapsed_ms
+
+
+def record_redis_commands(count: int, elapsed_ms: float):
+    metrics = request_metrics.get()
+    if metrics is not None:
+        metrics["redis_commands"] += count
+        metrics["redis_ms"] += elapsed_ms
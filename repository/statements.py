@@ -0,0 +1,453 @@
+from typing import Dict
+
+import sqlalchemy as sa
+from sqlalchemy import bindparam, delete, func, insert, literal_column, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.mysql.dml import OnDuplicateClause
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.elements import BindParameter, ClauseElement, ColumnClause
+from sqlalchemy.sql.functions import FunctionElement
+
+metadata = sa.MetaData()
+
+users = sa.Table(
+    "users", metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("first_name", sa.String(255), nullable=False),
+    sa.Column("last_name", sa.String(255), nullable=False),
+    sa.Column("email", sa.String(255), nullable=False),
+    sa.Column("phone", sa.String(255), nullable=False),
+    sa.Column("address", sa.String(255), nullable=False),
+    sa.Column("country", sa.String(255), nullable=False),
+    sa.Column("city", sa.String(255), nullable=False),
+    sa.Column("username", sa.String(255), nullable=False, unique=True),
+    sa.Column("hashed_password", sa.String(255), nullable=False),
+    sa.Column("is_logged", sa.Boolean, nullable=False),
+)
+
+item = sa.Table(
+    "item", metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("name", sa.String(255), nullable=False),
+    sa.Column("price", sa.Numeric(10, 2), nullable=False),
+    sa.Column("item_stock", sa.Integer, nullable=False),
+)
+
+orders = sa.Table(
+    "orders", metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+    sa.Column("order_date", sa.Date, nullable=False),
+    sa.Column("shipping_address", sa.Text, nullable=False),
+    sa.Column("total_price", sa.Numeric(10, 2), nullable=False),
+    sa.Column("status", sa.String(5), nullable=False),
+)
+
+order_item = sa.Table(
+    "order_item", metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("order_id", sa.Integer, sa.ForeignKey("orders.id", ondelete="CASCADE"), nullable=False),
+    sa.Column("item_id", sa.Integer, sa.ForeignKey("item.id"), nullable=False),
+    sa.Column("quantity", sa.Integer, nullable=False),
+)
+
+favorite_items = sa.Table(
+    "favorite_items", metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+    sa.Column("item_id", sa.Integer, sa.ForeignKey("item.id"), nullable=False),
+)
+
+
+class row_count(FunctionElement):
+    type = sa.Integer()
+    inherit_cache = True
+
+
+@compiles(row_count)
+def compile_row_count(element, compiler, **kw):
+    return "ROW_COUNT()"
+
+
+@compiles(row_count, "sqlite")
+def compile_row_count_sqlite(element, compiler, **kw):
+    return "changes()"
+
+
+@compiles(OnDuplicateClause, "sqlite")
+def compile_on_duplicate_sqlite(element, compiler, **kw):
+    def replace(obj):
+        if isinstance(obj, ColumnClause) and obj.table is element.inserted_alias:
+            return literal_column(f"excluded.{compiler.preparer.quote(obj.name)}")
+        return None
+
+    clauses = [
+        f"{compiler.preparer.quote(name)} = "
+        f"{compiler.process(visitors.replacement_traverse(value, {}, replace).self_group(), **kw)}"
+        for name, value in element.update.items()
+    ]
+    return "ON CONFLICT DO UPDATE SET " + ", ".join(clauses)
+
+
+class PreparedStatement:
+    """A Core statement compiled once per dialect; each call only binds new parameter values.
+
+    Statements with expanding ``IN`` parameters render differently for every list length,
+    so they are compiled per call instead.
+    """
+
+    def __init__(self, name: str, statement: ClauseElement):
+        self.name = name
+        self.statement = statement
+        self.expanding = False
+        self.bind_names = set()
+        visitors.traverse(statement, {}, {"bindparam": self._visit_bindparam})
+        self._compiled = {}
+
+    def _visit_bindparam(self, bind):
+        if bind.required:
+            self.bind_names.add(bind.key)
+        if bind.expanding:
+            self.expanding = True
+
+    def __call__(self, **values) -> "BoundStatement":
+        return BoundStatement(self, values)
+
+    def compiled(self, dialect):
+        compiled = self._compiled.get(dialect)
+        if compiled is None:
+            compiled = self.statement.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+            self._compiled[dialect] = compiled
+        return compiled
+
+
+class BoundStatement:
+    def __init__(self, prepared: PreparedStatement, values: dict):
+        self.prepared = prepared
+        self.values = values
+
+    def compile(self, dialect=None, compile_kwargs=None, **kw):
+        if self.prepared.expanding:
+            statement = visitors.replacement_traverse(self.prepared.statement, {}, self._bind_value)
+            return statement.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+        return BoundCompiled(self.prepared.compiled(dialect), self.values)
+
+    def _bind_value(self, obj):
+        if isinstance(obj, BindParameter) and obj.key in self.values:
+            return bindparam(obj.key, self.values[obj.key], type_=obj.type, expanding=obj.expanding)
+        return None
+
+
+class BoundCompiled:
+    def __init__(self, compiled, values: dict):
+        self._compiled = compiled
+        self._values = values
+
+    def construct_params(self, params=None, **kw):
+        return self._compiled.construct_params(self._values, **kw)
+
+    def __getattr__(self, name):
+        return getattr(self._compiled, name)
+
+
+REGISTRY: Dict[str, PreparedStatement] = {}
+
+
+def prepare(name: str, statement: ClauseElement) -> PreparedStatement:
+    prepared = PreparedStatement(name, statement)
+    REGISTRY[name] = prepared
+    return prepared
+
+
+def paged(statement, id_column):
+    return statement.where(id_column > bindparam("after_id")).order_by(id_column)
+
+
+USER_COLUMNS = [users.c[name] for name in (
+    "id", "first_name", "last_name", "email", "phone", "address", "country", "city", "username", "hashed_password",
+    "is_logged"
+)]
+USER_RESPONSE_COLUMNS = [users.c[name] for name in (
+    "id", "username", "first_name", "last_name", "email", "address", "country", "city"
+)]
+ITEM_COLUMNS = [item.c.id, item.c.name, item.c.price, item.c.item_stock]
+ORDER_COLUMNS = [
+    orders.c.id, orders.c.user_id, orders.c.order_date, orders.c.shipping_address, orders.c.total_price,
+    orders.c.status
+]
+ORDER_ITEM_COLUMNS = [order_item.c.id, order_item.c.order_id, order_item.c.item_id, order_item.c.quantity]
+FAVORITE_ITEM_COLUMNS = [favorite_items.c.id, favorite_items.c.user_id, favorite_items.c.item_id]
+
+# users
+USER_RESPONSE_BY_ID = prepare(
+    "user.get_user_by_id", select(*USER_RESPONSE_COLUMNS).where(users.c.id == bindparam("user_id"))
+)
+USER_BY_USERNAME = prepare(
+    "user.get_user_by_username", select(*USER_COLUMNS).where(users.c.username == bindparam("username"))
+)
+LOGGED_USERS_PAGE = prepare(
+    "user.get_all_users_page",
+    paged(select(*USER_COLUMNS).where(users.c.is_logged == bindparam("is_logged")), users.c.id)
+    .limit(bindparam("limit"))
+)
+INSERT_USER = prepare("user.create_user", insert(users).values(
+    first_name=bindparam("first_name"),
+    last_name=bindparam("last_name"),
+    email=bindparam("email"),
+    phone=bindparam("phone"),
+    address=bindparam("address"),
+    country=bindparam("country"),
+    city=bindparam("city"),
+    username=bindparam("username"),
+    hashed_password=bindparam("hashed_password"),
+    is_logged=bindparam("is_logged"),
+))
+UPDATE_USER_PROFILE = update(users).where(users.c.id == bindparam("user_id")).values(
+    first_name=bindparam("first_name"),
+    last_name=bindparam("last_name"),
+    email=bindparam("email"),
+    address=bindparam("address"),
+    country=bindparam("country"),
+    city=bindparam("city"),
+    username=bindparam("username"),
+)
+UPDATE_USER = prepare("user.update_user_by_id", UPDATE_USER_PROFILE)
+UPDATE_USER_WITH_PASSWORD = prepare(
+    "user.update_user_by_id_with_password", UPDATE_USER_PROFILE.values(hashed_password=bindparam("hashed_password"))
+)
+SET_USER_LOGGED = prepare(
+    "user.set_is_logged",
+    update(users).where(users.c.id == bindparam("user_id")).values(is_logged=bindparam("is_logged"))
+)
+DELETE_USER = prepare("user.delete_user_by_id", delete(users).where(users.c.id == bindparam("user_id")))
+
+# item
+ITEM_BY_ID = prepare("item.get_item_by_id", select(*ITEM_COLUMNS).where(item.c.id == bindparam("item_id")))
+ITEMS_BY_IDS = prepare(
+    "item.get_items_by_ids", select(*ITEM_COLUMNS).where(item.c.id.in_(bindparam("item_ids", expanding=True)))
+)
+ITEM_BY_NAME = prepare("item.get_item_by_name", select(*ITEM_COLUMNS).where(item.c.name == bindparam("item_name")))
+ITEMS = prepare("item.get_all_items", paged(select(*ITEM_COLUMNS), item.c.id))
+ITEMS_PAGE = prepare("item.get_all_items_page", ITEMS.statement.limit(bindparam("limit")))
+INSERT_ITEM = prepare("item.create_item", insert(item).values(
+    name=bindparam("name"), price=bindparam("price"), item_stock=bindparam("item_stock")
+))
+UPDATE_ITEM = prepare("item.update_item", update(item).where(item.c.id == bindparam("item_id")).values(
+    name=bindparam("name"), price=bindparam("price"), item_stock=bindparam("item_stock")
+))
+DELETE_ITEM = prepare("item.delete_item_by_id", delete(item).where(item.c.id == bindparam("item_id")))
+TEMP_ORDERS_WITH_ITEM = prepare(
+    "item.get_temp_orders_with_item",
+    select(orders.c.id, orders.c.user_id)
+    .select_from(orders.join(order_item, order_item.c.order_id == orders.c.id))
+    .where(order_item.c.item_id == bindparam("item_id"), orders.c.status == "TEMP")
+    .with_for_update()
+)
+
+# orders
+ORDER_BY_ID = prepare("order.get_order_by_id", select(*ORDER_COLUMNS).where(orders.c.id == bindparam("order_id")))
+ORDERS_BY_USER_ID = prepare(
+    "order.get_order_by_user_id", select(*ORDER_COLUMNS).where(orders.c.user_id == bindparam("user_id"))
+)
+ORDER_RESPONSE_ROWS = select(
+    orders.c.id, orders.c.shipping_address, orders.c.order_date, orders.c.status,
+    order_item.c.item_id, order_item.c.quantity, item.c.name, item.c.price, item.c.item_stock
+).select_from(
+    orders
+    .outerjoin(order_item, order_item.c.order_id == orders.c.id)
+    .outerjoin(item, item.c.id == order_item.c.item_id)
+).order_by(orders.c.id, order_item.c.id)
+ORDER_RESPONSES_BY_ID = prepare(
+    "order.get_order_response_by_id", ORDER_RESPONSE_ROWS.where(orders.c.id == bindparam("order_id"))
+)
+ORDER_RESPONSES_BY_USER_ID = prepare(
+    "order.get_order_responses_by_user_id", ORDER_RESPONSE_ROWS.where(orders.c.user_id == bindparam("user_id"))
+)
+TEMP_ORDER_BY_USER_ID = prepare(
+    "order.get_temp_order_by_user_id",
+    select(*ORDER_COLUMNS)
+    .where(orders.c.user_id == bindparam("user_id"), orders.c.status == "TEMP")
+    .order_by(orders.c.order_date.desc())
+    .limit(1)
+)
+ORDERS_PAGE = prepare(
+    "order.get_all_orders_page", paged(select(*ORDER_COLUMNS), orders.c.id).limit(bindparam("limit"))
+)
+ORDERS_EXPORT = prepare("order.iterate_all_orders", select(*ORDER_COLUMNS).order_by(orders.c.id))
+INSERT_ORDER = prepare("order.create_order", insert(orders).values(
+    user_id=bindparam("user_id"),
+    order_date=bindparam("order_date"),
+    shipping_address=bindparam("shipping_address"),
+    total_price=bindparam("total_price"),
+    status=bindparam("status"),
+))
+UPDATE_ORDER = prepare("order.update_order", update(orders).where(orders.c.id == bindparam("order_id")).values(
+    user_id=bindparam("user_id"),
+    order_date=bindparam("order_date"),
+    shipping_address=bindparam("shipping_address"),
+    total_price=bindparam("total_price"),
+    status=bindparam("status"),
+))
+ORDER_TOTAL = (
+    select(func.coalesce(func.sum(order_item.c.quantity * item.c.price), 0))
+    .select_from(order_item.join(item, item.c.id == order_item.c.item_id))
+    .where(order_item.c.order_id == orders.c.id)
+    .scalar_subquery()
+)
+RECOMPUTE_TEMP_ORDER_TOTAL = prepare(
+    "order.recompute_temp_order_total",
+    update(orders)
+    .where(orders.c.id == bindparam("order_id"), orders.c.status == "TEMP")
+    .values(total_price=ORDER_TOTAL)
+)
+RECOMPUTE_TEMP_ORDER_TOTALS = prepare(
+    "order.recompute_temp_order_totals",
+    update(orders)
+    .where(orders.c.id.in_(bindparam("order_ids", expanding=True)), orders.c.status == "TEMP")
+    .values(total_price=ORDER_TOTAL)
+)
+CLOSE_TEMP_ORDER = prepare(
+    "order.close_order",
+    update(orders).where(orders.c.id == bindparam("order_id"), orders.c.status == "TEMP").values(
+        order_date=bindparam("order_date"), shipping_address=bindparam("shipping_address"), status="CLOSE"
+    )
+)
+ORDER_LINE_COUNT = prepare(
+    "order.count_order_lines",
+    select(func.count()).select_from(order_item).where(order_item.c.order_id == bindparam("order_id"))
+)
+ORDER_LINE_QUANTITY = (
+    select(order_item.c.quantity)
+    .where(order_item.c.order_id == bindparam("order_id"), order_item.c.item_id == item.c.id)
+    .scalar_subquery()
+)
+DECREMENT_ORDER_STOCK = prepare(
+    "order.decrement_order_stock",
+    update(item)
+    .where(
+        item.c.id.in_(select(order_item.c.item_id).where(order_item.c.order_id == bindparam("order_id"))),
+        item.c.item_stock >= ORDER_LINE_QUANTITY
+    )
+    .values(item_stock=item.c.item_stock - ORDER_LINE_QUANTITY)
+)
+UNDER_STOCK_LINES = prepare(
+    "order.get_under_stock_lines",
+    select(order_item.c.item_id, order_item.c.quantity, item.c.name, item.c.item_stock)
+    .select_from(order_item.outerjoin(item, item.c.id == order_item.c.item_id))
+    .where(
+        order_item.c.order_id == bindparam("order_id"),
+        sa.or_(item.c.id.is_(None), item.c.item_stock < order_item.c.quantity)
+    )
+)
+ROW_COUNT = prepare("database.row_count", select(row_count()))
+DELETE_ORDER = prepare("order.delete_order_by_id", delete(orders).where(orders.c.id == bindparam("order_id")))
+DELETE_ORDERS_BY_USER_ID = prepare(
+    "order.delete_order_by_user_id", delete(orders).where(orders.c.user_id == bindparam("user_id"))
+)
+ORDER_IDS_BY_USER_ID_PAGE = prepare(
+    "order.get_order_ids_by_user_id_page",
+    paged(select(orders.c.id).where(orders.c.user_id == bindparam("user_id")), orders.c.id).limit(bindparam("limit"))
+)
+DELETE_ORDERS_BY_IDS = prepare(
+    "order.delete_orders_by_ids", delete(orders).where(orders.c.id.in_(bindparam("order_ids", expanding=True)))
+)
+
+# order_item
+ORDER_ITEMS_BY_ORDER_ID = prepare(
+    "order_item.get_order_items_by_order_id",
+    select(*ORDER_ITEM_COLUMNS).where(order_item.c.order_id == bindparam("order_id"))
+)
+ORDER_ITEM_BY_ORDER_AND_ITEM = prepare(
+    "order_item.get_order_item",
+    select(*ORDER_ITEM_COLUMNS).where(
+        order_item.c.order_id == bindparam("order_id"), order_item.c.item_id == bindparam("item_id")
+    )
+)
+ORDER_ITEMS = prepare("order_item.get_all_order_items", select(*ORDER_ITEM_COLUMNS))
+ORDER_ITEMS_EXPORT = prepare(
+    "order_item.iterate_all_order_items", select(*ORDER_ITEM_COLUMNS).order_by(order_item.c.id)
+)
+INSERT_ORDER_ITEM = prepare("order_item.create_order_items", insert(order_item).values(
+    order_id=bindparam("order_id"), item_id=bindparam("item_id"), quantity=bindparam("quantity")
+))
+ORDER_ITEM_UPSERT = mysql_insert(order_item).values(
+    order_id=bindparam("order_id"), item_id=bindparam("item_id"), quantity=bindparam("quantity")
+)
+UPSERT_ORDER_ITEM = prepare(
+    "order_item.upsert_order_item",
+    ORDER_ITEM_UPSERT.on_duplicate_key_update(quantity=ORDER_ITEM_UPSERT.inserted.quantity)
+)
+UPDATE_ORDER_ITEM_QUANTITY = prepare(
+    "order_item.update_order_item_quantity",
+    update(order_item)
+    .where(order_item.c.order_id == bindparam("order_id"), order_item.c.item_id == bindparam("item_id"))
+    .values(quantity=bindparam("quantity"))
+)
+DELETE_TEMP_ORDER_ITEMS_BY_ITEM_ID = prepare(
+    "order_item.delete_temp_order_items_by_item_id",
+    delete(order_item).where(
+        order_item.c.item_id == bindparam("item_id"),
+        order_item.c.order_id.in_(select(orders.c.id).where(orders.c.status == "TEMP"))
+    )
+)
+DELETE_ORDER_ITEMS = prepare(
+    "order_item.delete_all_order_items", delete(order_item).where(order_item.c.order_id == bindparam("order_id"))
+)
+DELETE_ORDER_ITEM = prepare(
+    "order_item.delete_order_item",
+    delete(order_item).where(
+        order_item.c.order_id == bindparam("order_id"), order_item.c.item_id == bindparam("item_id")
+    )
+)
+
+# favorite_items
+FAVORITE_ITEM_BY_ID = prepare(
+    "favorite_item.get_by_id",
+    select(*FAVORITE_ITEM_COLUMNS).where(favorite_items.c.id == bindparam("favorite_item_id"))
+)
+FAVORITE_ITEMS_BY_USER_ID = prepare(
+    "favorite_item.get_favorite_items_by_user_id",
+    select(*FAVORITE_ITEM_COLUMNS).where(favorite_items.c.user_id == bindparam("user_id"))
+)
+FAVORITE_ITEM_BY_USER_AND_ITEM = prepare(
+    "favorite_item.get_favorite_item_by_user_and_item",
+    select(*FAVORITE_ITEM_COLUMNS).where(
+        favorite_items.c.user_id == bindparam("user_id"), favorite_items.c.item_id == bindparam("item_id")
+    )
+)
+FAVORITE_ITEMS_PAGE = prepare(
+    "favorite_item.get_all_favorite_items_page",
+    paged(select(*FAVORITE_ITEM_COLUMNS), favorite_items.c.id).limit(bindparam("limit"))
+)
+INSERT_FAVORITE_ITEM = prepare("favorite_item.create_favorite_item", insert(favorite_items).values(
+    user_id=bindparam("user_id"), item_id=bindparam("item_id")
+))
+UPDATE_FAVORITE_ITEM = prepare(
+    "favorite_item.update_favorite_items",
+    update(favorite_items).where(favorite_items.c.id == bindparam("favorite_item_id")).values(
+        user_id=bindparam("user_id"), item_id=bindparam("item_id")
+    )
+)
+DELETE_FAVORITE_ITEM = prepare(
+    "favorite_item.delete_by_id", delete(favorite_items).where(favorite_items.c.id == bindparam("favorite_item_id"))
+)
+DELETE_FAVORITE_ITEM_BY_USER_AND_ITEM = prepare(
+    "favorite_item.delete_by_user_and_item_id",
+    delete(favorite_items).where(
+        favorite_items.c.user_id == bindparam("user_id"), favorite_items.c.item_id == bindparam("item_id")
+    )
+)
+DELETE_FAVORITES_BY_USER_ID = prepare(
+    "favorite_item.delete_favorites_by_user_id",
+    delete(favorite_items).where(favorite_items.c.user_id == bindparam("user_id"))
+)
+DELETE_FAVORITES_BY_ITEM_ID = prepare(
+    "favorite_item.delete_favorite_items_by_item_id",
+    delete(favorite_items).where(favorite_items.c.item_id == bindparam("item_id"))
+)
+
+
+def insert_order_items(rows: list):
+    # A multi-row VALUES clause differs per row count, so it is built per call rather than prepared.
+    return insert(order_item).values(rows)
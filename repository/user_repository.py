@@ -1,94 +1,74 @@
-import json
+from functools import partial
 from typing import Optional, List
 
 from model.user import User
 from model.user_request import UserRequest
-from repository import cache_repository
-from repository.database import database
+from model.user_response import UserResponse
+from repository import cache_repository, cache_codec, order_repository, statements
+from repository.database import database, pin_to_primary, read_all, read_one, user_scope
 
-TABLE_NAME = "users"
+decode_user = partial(cache_codec.decode, UserResponse)
 
 
-async def get_user_by_id(user_id: int) -> Optional[User]:
-    if cache_repository.is_key_exists(str(user_id)):
-        string_user = cache_repository.get_cache_entity(str(user_id))
-        user_data = json.loads(string_user)
-        if user_data:
-            query = f"SELECT * FROM {TABLE_NAME} WHERE id=:user_id"
-            result = await database.fetch_one(query, values={"user_id": user_id})
-            if result:
-                return User(**result)
-    else:
-        query = f"SELECT * FROM {TABLE_NAME} WHERE id=:user_id"
-        result = await database.fetch_one(query, values={"user_id": user_id})
-        if result:
-            user = User(**result)
-            user_cache_data = {
-                "id": user.id,
-                "username": user.username,
-                "first_name": user.first_name,
-                "last_name": user.last_name,
-                "email": user.email,
-                "is_logged": user.is_logged
-            }
-            cache_repository.create_cache_entity(str(user_id), json.dumps(user_cache_data))
-            return user
-        else:
-            return None
+def user_cache_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def user_to_response(user: User) -> UserResponse:
+    return UserResponse(
+        id=user.id,
+        username=user.username,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        email=user.email,
+        address=user.address,
+        country=user.country,
+        city=user.city,
+    )
+
+
+async def cache_user_from_db(user_id: int):
+    result = await read_one(statements.USER_RESPONSE_BY_ID(user_id=user_id), user_scope(user_id))
+    if result:
+        await cache_repository.set_cache_entity(
+            user_cache_key(user_id), cache_codec.encode(UserResponse, UserResponse(**result))
+        )
+
+
+async def get_user_by_id(user_id: int) -> Optional[UserResponse]:
+    async def load_user() -> Optional[bytes]:
+        result = await read_one(statements.USER_RESPONSE_BY_ID(user_id=user_id), user_scope(user_id))
+        return cache_codec.encode(UserResponse, UserResponse(**result)) if result else None
+
+    return await cache_repository.get_or_load(user_cache_key(user_id), load_user, decode_user)
 
 
 async def get_user_by_username(username: str) -> Optional[User]:
-    query = f"SELECT * FROM {TABLE_NAME} WHERE username=:username"
-    result = await database.fetch_one(query, values={"username": username})
+    result = await database.fetch_one(statements.USER_BY_USERNAME(username=username))
     if result:
         return User(**result)
     else:
         return None
 
 
-async def get_all_users() -> List[User]:
-    query = f"SELECT * FROM {TABLE_NAME} WHERE is_logged=:is_logged"
-    results = await database.fetch_all(query, values={"is_logged": True})
+async def get_all_users(limit: int, after_id: int = 0) -> List[User]:
+    results = await read_all(statements.LOGGED_USERS_PAGE(is_logged=True, after_id=after_id, limit=limit))
     return [User(**result) for result in results]
 
 
 async def create_user(user: UserRequest, hashed_password: str):
-    query = f"""
-        INSERT INTO {TABLE_NAME} (first_name, last_name, email, phone, address, country, city, username, hashed_password, is_logged)
-        VALUES (:first_name, :last_name, :email, :phone, :address, :country, :city, :username, :hashed_password, :is_logged)
-    """
     user_dict = user.dict()
     del user_dict["password"]
-    values = {**user_dict, "hashed_password": hashed_password, "is_logged": True}
-    async with database.transaction():
-        await database.execute(query, values)
-        last_record_id = await database.fetch_one("SELECT LAST_INSERT_ID()")
+    user_id = await database.execute(
+        statements.INSERT_USER(**user_dict, hashed_password=hashed_password, is_logged=True)
+    )
+    await pin_to_primary(user_scope(user_id))
 
-    user_id = last_record_id[0]
-    user_cache_data = {
-        "id": user_id,
-        "username": user.username,
-        "first_name": user.first_name,
-        "last_name": user.last_name,
-        "email": user.email,
-        "is_logged": True
-    }
-    cache_repository.create_cache_entity(str(user_id), json.dumps(user_cache_data))
+    user_response = UserResponse(id=user_id, **user.dict(exclude={"password", "phone"}))
+    await cache_repository.set_cache_entity(user_cache_key(user_id), cache_codec.encode(UserResponse, user_response))
 
 
 async def update_user_by_id(user_id: int, user: UserRequest, hashed_password: Optional[str] = None):
-    query = f"""
-        UPDATE {TABLE_NAME} 
-        SET first_name = :first_name,
-        last_name = :last_name,
-        email = :email,
-        address = :address,
-        country = :country,
-        city = :city,
-        username = :username,
-        {"hashed_password = :hashed_password" if hashed_password else ""}
-        WHERE id = :user_id
-    """
     values = {
         "user_id": user_id,
         "first_name": user.first_name,
@@ -100,44 +80,33 @@ async def update_user_by_id(user_id: int, user: UserRequest, hashed_password: Op
         "username": user.username
     }
     if hashed_password:
-        values["hashed_password"] = hashed_password
+        query = statements.UPDATE_USER_WITH_PASSWORD(**values, hashed_password=hashed_password)
+    else:
+        query = statements.UPDATE_USER(**values)
 
-    await database.execute(query, values=values)
+    await database.execute(query)
+    await pin_to_primary(user_scope(user_id))
+    user_response = UserResponse(id=user_id, **user.dict(exclude={"password", "phone"}))
+    await cache_repository.set_cache_entity(user_cache_key(user_id), cache_codec.encode(UserResponse, user_response))
 
 
 async def login_user(user_id: int):
-    query = f"""
-        UPDATE {TABLE_NAME} 
-        SET is_logged = :is_logged
-        WHERE id = :user_id
-    """
-    values = {
-        "user_id": user_id,
-        "is_logged": True
-    }
-
-    await database.execute(query, values=values)
+    await database.execute(statements.SET_USER_LOGGED(user_id=user_id, is_logged=True))
+    await pin_to_primary(user_scope(user_id))
+    await cache_user_from_db(user_id)
 
 
 async def logout_user(user_id: int):
-    query = f"""
-           UPDATE {TABLE_NAME} 
-           SET is_logged = :is_logged
-           WHERE id = :user_id
-       """
-    values = {
-        "user_id": user_id,
-        "is_logged": False
-    }
-
-    await database.execute(query, values=values)
+    await database.execute(statements.SET_USER_LOGGED(user_id=user_id, is_logged=False))
+    await pin_to_primary(user_scope(user_id))
+    await cache_repository.remove_cache_entity(user_cache_key(user_id))
 
 
 async def delete_user_by_id(user_id: int):
-    cache_repository.remove_cache_entity(str(user_id))
-    query = f"DELETE FROM {TABLE_NAME} WHERE id=:user_id"
-    await database.execute(query, values={"user_id": user_id})
-
-    cache_key = f"temp_order_user_{user_id}"
-    cache_repository.remove_cache_entity(cache_key)
+    async with database.transaction():
+        await database.execute(statements.DELETE_FAVORITES_BY_USER_ID(user_id=user_id))
+        await database.execute(statements.DELETE_ORDERS_BY_USER_ID(user_id=user_id))
+        await database.execute(statements.DELETE_USER(user_id=user_id))
+    await pin_to_primary(user_scope(user_id))
 
+    await cache_repository.evict([user_cache_key(user_id)], [order_repository.cart_namespace(user_id)])
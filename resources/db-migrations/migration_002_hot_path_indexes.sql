@@ -0,0 +1,22 @@
+DELETE duplicate FROM order_item duplicate
+JOIN order_item original
+    ON duplicate.order_id = original.order_id
+    AND duplicate.item_id = original.item_id
+    AND duplicate.id > original.id;
+
+DELETE duplicate FROM favorite_items duplicate
+JOIN favorite_items original
+    ON duplicate.user_id = original.user_id
+    AND duplicate.item_id = original.item_id
+    AND duplicate.id > original.id;
+
+CREATE INDEX idx_orders_user_status_date ON orders (user_id, status, order_date);
+CREATE INDEX idx_orders_status ON orders (status);
+CREATE UNIQUE INDEX uq_order_item_order_item ON order_item (order_id, item_id);
+CREATE INDEX idx_order_item_item ON order_item (item_id);
+CREATE UNIQUE INDEX uq_favorite_items_user_item ON favorite_items (user_id, item_id);
+CREATE INDEX idx_favorite_items_item ON favorite_items (item_id);
+CREATE INDEX idx_users_is_logged ON users (is_logged);
+CREATE INDEX idx_item_name ON item (name);
+
+INSERT INTO schema_migrations (version) VALUES ('002');
@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# The per-request query counters are read from the debug headers.
+os.environ["DEBUG"] = "true"
+
+import httpx
+
+import main
+from model.user_response import UserResponse
+from repository import cache_repository, statements, user_repository
+from repository.database import database
+
+BENCH_USER = {
+    "first_name": "Bench", "last_name": "User", "email": "bench@example.com", "phone": "0", "address": "bench",
+    "country": "bench", "city": "bench", "password": "bench",
+}
+
+
+async def uncached_get_user_by_id(user_id: int):
+    # The lookup before the user cache became authoritative: check the key, then query the database anyway.
+    await cache_repository.is_key_exists(user_repository.user_cache_key(user_id))
+    result = await database.fetch_one(statements.USER_RESPONSE_BY_ID(user_id=user_id))
+    return UserResponse(**result) if result else None
+
+
+async def authenticated_requests(client: httpx.AsyncClient, user_id: int, headers: dict, requests: int) -> int:
+    queries = 0
+    for _ in range(requests):
+        response = await client.get(f"/user/{user_id}", headers=headers)
+        response.raise_for_status()
+        queries += int(response.headers["X-DB-Queries"])
+    return queries
+
+
+async def measure(label: str, client: httpx.AsyncClient, user_id: int, headers: dict, concurrency: int,
+                  requests: int):
+    started = time.perf_counter()
+    queries = await asyncio.gather(*[
+        authenticated_requests(client, user_id, headers, requests) for _ in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+    total = concurrency * requests
+    print(f"{label:<14} {total} requests in {elapsed:.2f}s ({total / elapsed:.0f} req/s), "
+          f"{sum(queries) / total:.2f} DB queries per request")
+
+
+async def run(concurrency: int, requests: int):
+    await main.startup()
+    try:
+        async with httpx.AsyncClient(app=main.app, base_url="http://bench") as client:
+            username = f"auth_bench_{time.time_ns()}"
+            (await client.post("/user/", json={**BENCH_USER, "username": username})).raise_for_status()
+            auth = (await client.post("/auth/token", data={"username": username, "password": "bench"})).json()
+            user_id = auth["user_id"]
+            headers = {"Authorization": f"Bearer {auth['jwt_token']}"}
+            try:
+                cached_get_user_by_id = user_repository.get_user_by_id
+                user_repository.get_user_by_id = uncached_get_user_by_id
+                try:
+                    await measure("before", client, user_id, headers, concurrency, requests)
+                finally:
+                    user_repository.get_user_by_id = cached_get_user_by_id
+                await measure("user cache", client, user_id, headers, concurrency, requests)
+            finally:
+                await client.delete(f"/user/{user_id}", headers=headers)
+    finally:
+        await main.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Authenticated request throughput, in process")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=40)
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency, args.requests))
@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import redis
+import redis.asyncio
+
+from config.config import Config
+
+config = Config()
+
+BENCH_KEYS = [f"bench:cache_latency:{index}" for index in range(3)]
+BENCH_VALUE = b"x" * 512
+# Stands in for the rest of a request (DB query, serialization) so tasks interleave on the event loop.
+OTHER_IO_SECONDS = 0.001
+
+
+async def forward(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, delay: float):
+    try:
+        while data := await reader.read(65536):
+            if delay:
+                await asyncio.sleep(delay)
+            writer.write(data)
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+def start_latency_proxy(rtt_ms: float) -> int:
+    # Runs on its own thread and loop so a blocking client cannot stall the proxy as well.
+    loop = asyncio.new_event_loop()
+
+    async def handle(client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter):
+        server_reader, server_writer = await asyncio.open_connection(config.REDIS_HOST, int(config.REDIS_PORT))
+        await asyncio.gather(
+            forward(client_reader, server_writer, 0), forward(server_reader, client_writer, rtt_ms / 1000)
+        )
+
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    server = asyncio.run_coroutine_threadsafe(asyncio.start_server(handle, "127.0.0.1", 0), loop).result()
+    return server.sockets[0].getsockname()[1]
+
+
+async def timed_requests(cache_get: Callable[[str], Awaitable], requests: int) -> List[float]:
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await asyncio.sleep(OTHER_IO_SECONDS)
+        for key in BENCH_KEYS:
+            await cache_get(key)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def measure(label: str, cache_get: Callable[[str], Awaitable], concurrency: int, requests: int):
+    started = time.perf_counter()
+    results = await asyncio.gather(*[timed_requests(cache_get, requests) for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    latencies = [latency for result in results for latency in result]
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f"{label:<10} {len(latencies)} requests in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} req/s)  "
+          f"p50 {percentiles[49]:.2f} ms  p99 {percentiles[98]:.2f} ms")
+
+
+async def run(concurrency: int, requests: int, rtt_ms: float):
+    host, port = config.REDIS_HOST, int(config.REDIS_PORT)
+    if rtt_ms:
+        host, port = "127.0.0.1", start_latency_proxy(rtt_ms)
+
+    # The client before the asyncio rewrite, called from coroutines, and the pooled asyncio client used now.
+    sync_client = redis.StrictRedis(host=host, port=port, socket_timeout=config.REDIS_SOCKET_TIMEOUT)
+    async_client = redis.asyncio.StrictRedis(connection_pool=redis.asyncio.BlockingConnectionPool(
+        host=host,
+        port=port,
+        max_connections=config.REDIS_MAX_CONNECTIONS,
+        timeout=config.REDIS_POOL_TIMEOUT,
+        socket_timeout=config.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=config.REDIS_CONNECT_TIMEOUT,
+    ))
+    for key in BENCH_KEYS:
+        sync_client.set(key, BENCH_VALUE)
+
+    async def blocking_get(key: str):
+        return sync_client.get(key)
+
+    # Open the pool's connections up front so connection setup is not counted as request latency.
+    await asyncio.gather(*[async_client.ping() for _ in range(min(concurrency, config.REDIS_MAX_CONNECTIONS))])
+    try:
+        await measure("blocking", blocking_get, concurrency, requests)
+        await measure("asyncio", async_client.get, concurrency, requests)
+    finally:
+        sync_client.delete(*BENCH_KEYS)
+        sync_client.close()
+        await async_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Request latency with the blocking and the asyncio Redis client")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--rtt-ms", type=float, default=0, help="add this much latency to every Redis reply")
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency, args.requests, args.rtt_ms))
@@ -0,0 +1,75 @@
+import argparse
+import json
+import sys
+import timeit
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from model.item import Item
+from model.order import Order
+from model.order_item_detail import OrderItemDetail
+from model.order_response import OrderResponse
+from model.order_status import OrderStatus
+from repository import cache_codec
+
+
+def sample_payloads(size: int) -> dict:
+    items = [Item(id=index, name=f"Speaker {index}", price=Decimal("49.99"), item_stock=index) for index in range(size)]
+    order = Order(id=1, user_id=1, order_date=date.today(), shipping_address="1 Main St, Tel Aviv, Israel",
+                  total_price=499.9, status=OrderStatus.TEMP)
+    order_response = OrderResponse(
+        id=1,
+        item=[OrderItemDetail(item_id=index, name=f"Speaker {index}", price=49.99, quantity=2, item_stock=index)
+              for index in range(size)],
+        total_price=99.98 * size,
+        shipping_address="1 Main St, Tel Aviv, Israel",
+        order_date=date.today(),
+        status=OrderStatus.TEMP,
+    )
+    return {
+        "Item": (Item, items[0]),
+        f"Item x{size}": (Item, items),
+        "Order": (Order, order),
+        f"OrderResponse ({size} lines)": (OrderResponse, order_response),
+    }
+
+
+# The cache path before the codec: each model went through .json(), was parsed back and dumped again, and reads
+# re-validated every row with Model(**data).
+def json_encode(value) -> str:
+    if isinstance(value, list):
+        return json.dumps([json.loads(item.json()) for item in value])
+    return value.json()
+
+
+def json_decode(model_cls, data: str):
+    value = json.loads(data)
+    if isinstance(value, list):
+        return [model_cls(**item) for item in value]
+    return model_cls(**value)
+
+
+def benchmark(size: int, number: int):
+    for name, (model_cls, value) in sample_payloads(size).items():
+        json_data = json_encode(value)
+        codec_data = cache_codec.encode(model_cls, value)
+        timings = {
+            "json encode": timeit.timeit(lambda: json_encode(value), number=number),
+            "codec encode": timeit.timeit(lambda: cache_codec.encode(model_cls, value), number=number),
+            "json decode": timeit.timeit(lambda: json_decode(model_cls, json_data), number=number),
+            "codec decode": timeit.timeit(lambda: cache_codec.decode(model_cls, codec_data), number=number),
+        }
+        print(f"{name:<26} " + "  ".join(
+            f"{label} {seconds / number * 1e6:8.1f} us" for label, seconds in timings.items()
+        ) + f"  size {len(json_data)} -> {len(codec_data)} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cache payload encode/decode cost, JSON path against cache_codec")
+    parser.add_argument("--size", type=int, default=50, help="items in the list and lines in the order response")
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+    benchmark(args.size, args.number)
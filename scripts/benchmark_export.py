@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import insert
+
+import main
+from repository import statements
+from repository.database import database
+
+SEED_BATCH_SIZE = 5000
+CHECKPOINTS = 10
+
+
+async def create_bench_user() -> int:
+    return await database.execute(statements.INSERT_USER(
+        first_name="Bench", last_name="Export", email="bench@example.com", phone="0", address="bench",
+        country="bench", city="bench", username=f"export_bench_{time.time_ns()}", hashed_password="-",
+        is_logged=False
+    ))
+
+
+async def seed_orders(user_id: int, rows: int):
+    for start in range(0, rows, SEED_BATCH_SIZE):
+        await database.execute(insert(statements.orders).values([
+            {"user_id": user_id, "order_date": date.today(), "shipping_address": f"{index} Main St, Tel Aviv",
+             "total_price": index % 1000, "status": "CLOSE"}
+            for index in range(start, min(start + SEED_BATCH_SIZE, rows))
+        ]))
+
+
+async def stream_export(export_format: str, rows: int):
+    # Drives the ASGI app directly and drops each chunk, so only the route's own memory is traced. The
+    # httpx test transport would buffer the whole body.
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "path": "/order/export",
+        "raw_path": b"/order/export", "root_path": "", "query_string": f"format={export_format}".encode(),
+        "headers": [], "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    progress = {"bytes": 0, "lines": 0, "next_checkpoint": 1}
+    started = time.perf_counter()
+    peaks = []
+
+    request_sent = asyncio.Event()
+    response_done = asyncio.Event()
+
+    async def receive():
+        if not request_sent.is_set():
+            request_sent.set()
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] != "http.response.body":
+            return
+        if not message.get("more_body", False):
+            response_done.set()
+        body = message.get("body", b"")
+        progress["bytes"] += len(body)
+        progress["lines"] += body.count(b"\n")
+        while progress["lines"] >= rows * progress["next_checkpoint"] / CHECKPOINTS:
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak)
+            print(f"{progress['lines']:>10} rows  {progress['bytes'] / 2 ** 20:8.1f} MB sent  "
+                  f"{time.perf_counter() - started:6.2f}s  peak traced memory {peak / 2 ** 20:6.2f} MB")
+            progress["next_checkpoint"] += 1
+
+    tracemalloc.start()
+    try:
+        await main.app(scope, receive, send)
+    finally:
+        tracemalloc.stop()
+    elapsed = time.perf_counter() - started
+    print(f"{export_format}: {progress['lines']} rows, {progress['bytes'] / 2 ** 20:.1f} MB in {elapsed:.2f}s "
+          f"({progress['lines'] / elapsed:.0f} rows/s)")
+    return peaks
+
+
+async def run(rows: int, export_format: str, growth: float):
+    await main.startup()
+    try:
+        user_id = await create_bench_user()
+        try:
+            started = time.perf_counter()
+            await seed_orders(user_id, rows)
+            print(f"seeded {rows} orders in {time.perf_counter() - started:.2f}s")
+            peaks = await stream_export(export_format, rows)
+        finally:
+            await database.execute(statements.DELETE_ORDERS_BY_USER_ID(user_id=user_id))
+            await database.execute(statements.DELETE_USER(user_id=user_id))
+    finally:
+        await main.shutdown()
+
+    if peaks and peaks[-1] > peaks[0] * growth:
+        print(f"Peak memory grew from {peaks[0] / 2 ** 20:.2f} MB to {peaks[-1] / 2 ** 20:.2f} MB with the row count")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream the order export and check that memory stays flat")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--growth", type=float, default=1.5,
+                        help="fail if the final peak is more than this factor above the peak at the first 10%%")
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.format, args.growth))
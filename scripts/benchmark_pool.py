@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from databases import Database
+
+from config.config import Config
+from repository import statements
+
+config = Config()
+
+
+async def timed_requests(handle: Database, requests: int) -> List[Tuple[float, float]]:
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        async with handle.connection() as connection:
+            acquired = time.perf_counter()
+            await connection.fetch_all(statements.ITEMS_PAGE(after_id=0, limit=config.PAGE_SIZE_DEFAULT + 1))
+        finished = time.perf_counter()
+        timings.append(((acquired - started) * 1000, (finished - started) * 1000))
+    return timings
+
+
+async def measure(pool_size: int, concurrency: int, requests: int):
+    handle = Database(
+        config.DATABASE_URL, min_size=pool_size, max_size=pool_size, pool_recycle=config.DATABASE_POOL_RECYCLE
+    )
+    await handle.connect()
+    try:
+        started = time.perf_counter()
+        results = await asyncio.gather(*[timed_requests(handle, requests) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+    finally:
+        await handle.disconnect()
+    waits = [wait for result in results for wait, _ in result]
+    latencies = [latency for result in results for _, latency in result]
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f"pool {pool_size:>4}  {len(latencies)} requests in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} req/s)  "
+          f"p50 {percentiles[49]:.2f} ms  p99 {percentiles[98]:.2f} ms  "
+          f"average acquire wait {statistics.fmean(waits):.2f} ms")
+
+
+async def run(pool_sizes: List[int], concurrency: int, requests: int):
+    for pool_size in pool_sizes:
+        await measure(pool_size, concurrency, requests)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Catalog query throughput against MySQL for several pool sizes")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 5, 10, 20, 50])
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+    if not config.DATABASE_URL.startswith("mysql"):
+        parser.error(f"DATABASE_URL must point at MySQL, got {config.DATABASE_URL}")
+    asyncio.run(run(args.pool_sizes, args.concurrency, args.requests))
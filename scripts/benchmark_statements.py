@@ -0,0 +1,69 @@
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from databases.backends.mysql import MySQLBackend
+from databases.core import Connection
+from sqlalchemy import text
+
+from repository import statements
+
+# Per-call compile work done by the MySQL backend for the old f-string text queries and the prepared statements.
+CASES = {
+    "item.get_item_by_id": (
+        "SELECT * FROM item WHERE id=:item_id",
+        {"item_id": 1},
+        lambda: statements.ITEM_BY_ID(item_id=1),
+    ),
+    "user.get_user_by_username": (
+        "SELECT * FROM users WHERE username=:username",
+        {"username": "lsmith"},
+        lambda: statements.USER_BY_USERNAME(username="lsmith"),
+    ),
+    "order.get_order_response_by_id": (
+        """
+        SELECT o.id, o.shipping_address, o.order_date, o.status,
+               oi.item_id, oi.quantity, i.name, i.price, i.item_stock
+        FROM orders o
+        LEFT JOIN order_item oi ON oi.order_id = o.id
+        LEFT JOIN item i ON i.id = oi.item_id
+        WHERE o.id = :order_id
+        ORDER BY o.id, oi.id
+        """,
+        {"order_id": 1},
+        lambda: statements.ORDER_RESPONSES_BY_ID(order_id=1),
+    ),
+    "order.update_order": (
+        """
+        UPDATE orders
+        SET user_id = :user_id, order_date = :order_date, shipping_address = :shipping_address,
+        total_price = :total_price, status = :status
+        WHERE id = :order_id
+        """,
+        {"order_id": 1, "user_id": 1, "order_date": "2024-01-01", "shipping_address": "x", "total_price": 1,
+         "status": "TEMP"},
+        lambda: statements.UPDATE_ORDER(order_id=1, user_id=1, order_date="2024-01-01", shipping_address="x",
+                                        total_price=1, status="TEMP"),
+    ),
+}
+
+
+def benchmark(number: int = 20000):
+    connection = MySQLBackend("mysql://localhost/bench").connection()
+    for name, (query, values, prepared) in CASES.items():
+        text_seconds = timeit.timeit(
+            lambda: connection._compile(Connection._build_query(query, values)), number=number
+        )
+        prepared_seconds = timeit.timeit(lambda: connection._compile(prepared()), number=number)
+        text_us = text_seconds / number * 1e6
+        prepared_us = prepared_seconds / number * 1e6
+        print(
+            f"{name:<35} text {text_us:7.1f} us  prepared {prepared_us:6.1f} us  "
+            f"saved {text_us - prepared_us:7.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
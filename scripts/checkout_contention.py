@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from model.item import Item
+from model.order import Order
+from model.order_status import OrderStatus
+from repository import cache_repository, item_repository, order_repository, statements
+from repository.database import database
+
+
+async def create_buyer() -> int:
+    return await database.execute(statements.INSERT_USER(
+        first_name="Bench", last_name="Buyer", email="bench@example.com", phone="0", address="bench",
+        country="bench", city="bench", username=f"checkout_bench_{time.time_ns()}", hashed_password="-",
+        is_logged=False
+    ))
+
+
+async def checkout(order_id: int, user_id: int) -> bool:
+    try:
+        await order_repository.close_order(order_id, user_id, "bench", date.today())
+        return True
+    except ValueError:
+        return False
+
+
+async def create_orders(buyers: int, stock: int, quantity: int):
+    item_id = await item_repository.create_item(
+        Item(name=f"checkout-bench-{time.time_ns()}", price=1, item_stock=stock)
+    )
+    user_id = await create_buyer()
+    order = Order(user_id=user_id, order_date=date.today(), shipping_address="bench", total_price=quantity,
+                  status=OrderStatus.TEMP)
+    order_ids = [await order_repository.create_order(order, {item_id: quantity}) for _ in range(buyers)]
+    return item_id, user_id, order_ids
+
+
+async def run(buyers: int, stock: int, quantity: int):
+    await database.connect()
+    try:
+        # Set up in a separate task so the checkouts below do not inherit its connection and each gets its own.
+        item_id, user_id, order_ids = await asyncio.create_task(create_orders(buyers, stock, quantity))
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*[checkout(order_id, user_id) for order_id in order_ids])
+        elapsed = time.perf_counter() - started
+
+        sold = sum(results)
+        remaining = (await database.fetch_one(statements.ITEM_BY_ID(item_id=item_id)))["item_stock"]
+        print(f"{buyers} buyers, stock {stock}, quantity {quantity}: {sold} checkouts succeeded in {elapsed:.3f}s "
+              f"({buyers / elapsed:.0f} checkouts/s), remaining stock {remaining}")
+
+        await order_repository.delete_order_by_user_id(user_id)
+        await database.execute(statements.DELETE_USER(user_id=user_id))
+        await item_repository.delete_item_by_id(item_id)
+
+        if remaining != stock - sold * quantity or remaining < 0 or sold != min(buyers, stock // quantity):
+            print("Stock is inconsistent with the successful checkouts")
+            sys.exit(1)
+    finally:
+        await database.disconnect()
+        await cache_repository.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent checkouts of a single item")
+    parser.add_argument("--buyers", type=int, default=200)
+    parser.add_argument("--stock", type=int, default=50)
+    parser.add_argument("--quantity", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run(args.buyers, args.stock, args.quantity))
@@ -0,0 +1,52 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.dialects import mysql
+
+from repository.database import database
+from repository.statements import REGISTRY
+
+# Bind values used to plan each statement; anything not listed here is bound to 1.
+SAMPLE_VALUES = {
+    "item_ids": [1, 2],
+    "item_name": "Bluetooth Speaker",
+    "username": "lsmith",
+    "is_logged": True,
+    "after_id": 0,
+    "limit": 50,
+}
+
+# Statements that read a whole table by design.
+FULL_TABLE_STATEMENTS = {"order_item.get_all_order_items"}
+
+explain_dialect = mysql.dialect(paramstyle="named")
+
+
+async def explain_queries() -> int:
+    full_scans = 0
+    await database.connect()
+    try:
+        for name, prepared in REGISTRY.items():
+            if prepared.statement.is_insert:
+                continue
+            statement = prepared(**{key: SAMPLE_VALUES.get(key, 1) for key in prepared.bind_names})
+            compiled = statement.compile(dialect=explain_dialect)
+            plan = await database.fetch_all(f"EXPLAIN {compiled.string}", values=compiled.construct_params())
+            for row in plan:
+                row = dict(row)
+                full_scan = row.get("type") == "ALL" and name not in FULL_TABLE_STATEMENTS
+                full_scans += full_scan
+                print(
+                    f"{'FULL SCAN' if full_scan else 'ok':<9} {name:<50} "
+                    f"table={row.get('table')} type={row.get('type')} key={row.get('key')} rows={row.get('rows')}"
+                )
+    finally:
+        await database.disconnect()
+    return full_scans
+
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(explain_queries()) else 0)
@@ -0,0 +1,49 @@
+import asyncio
+import re
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from repository.database import database
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "resources" / "db-migrations"
+
+
+def migration_version(path: Path) -> str:
+    return re.match(r"migration_(\d+)_", path.name).group(1)
+
+
+async def applied_versions() -> set:
+    await database.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(32) PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+        )
+    """)
+    results = await database.fetch_all("SELECT version FROM schema_migrations")
+    return {result["version"] for result in results}
+
+
+async def migrate():
+    await database.connect()
+    try:
+        applied = await applied_versions()
+        for path in sorted(MIGRATIONS_DIR.glob("migration_*.sql")):
+            version = migration_version(path)
+            if version in applied:
+                continue
+            print(f"Applying {path.name}")
+            statements = [statement.strip() for statement in path.read_text().split(";")]
+            for statement in statements:
+                if statement and not statement.startswith("INSERT INTO schema_migrations"):
+                    await database.execute(statement)
+            await database.execute(
+                "INSERT IGNORE INTO schema_migrations (version) VALUES (:version)", values={"version": version}
+            )
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,35 @@
+import csv
+import io
+from typing import AsyncIterator, List, Type
+
+from pydantic import BaseModel
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def to_ndjson(batches: AsyncIterator[List[BaseModel]]) -> AsyncIterator[str]:
+    async for batch in batches:
+        yield "".join(f"{model.json()}\n" for model in batch)
+
+
+async def to_csv(model_cls: Type[BaseModel], batches: AsyncIterator[List[BaseModel]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(model_cls.__fields__)
+    async for batch in batches:
+        for model in batch:
+            writer.writerow(getattr(value, "value", value) for value in model.dict().values())
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_rows(model_cls: Type[BaseModel], batches: AsyncIterator[List[BaseModel]], export_format: str) -> AsyncIterator[str]:
+    if export_format == "csv":
+        return to_csv(model_cls, batches)
+    return to_ndjson(batches)
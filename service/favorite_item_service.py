@@ -3,6 +3,7 @@ from typing import Optional, List
 from model.favorite_item import FavoriteItem
 from model.favorite_item_request import FavoriteItemRequest
 from model.favorite_item_response import FavoriteItemResponse
+from model.page import Page
 from repository import favorite_item_repository
 from service import user_service, item_service
 
@@ -14,17 +15,17 @@ async def get_by_id(favorite_item_id: int) -> Optional[FavoriteItem]:
 async def get_favorite_items_by_user_id(user_id: int) -> List[FavoriteItemResponse]:
     favorite_items = await favorite_item_repository.get_favorite_items_by_user_id(user_id)
     if favorite_items is not None:
+        items = await item_service.get_items_by_ids([favorite_item.item_id for favorite_item in favorite_items])
         response = [
-            FavoriteItemResponse(
-                item=(await item_service.get_item_by_id(favorite_item.item_id))
-            )
+            FavoriteItemResponse(item=items.get(favorite_item.item_id))
             for favorite_item in favorite_items
         ]
         return response
 
 
-async def get_all_favorite_items() -> List[FavoriteItem]:
-    return await favorite_item_repository.get_all_favorite_items()
+async def get_all_favorite_items(limit: int, after_id: int = 0) -> Page[FavoriteItem]:
+    favorite_items = await favorite_item_repository.get_all_favorite_items(limit + 1, after_id)
+    return Page.from_results(favorite_items, limit)
 
 
 async def create_favorite_item(favorite_item_request: FavoriteItemRequest) -> Optional[int]:
@@ -42,12 +43,12 @@ async def create_favorite_item(favorite_item_request: FavoriteItemRequest) -> Op
     return None
 
 
-async def update_favorite_items(favorite_item_id: int, favorite_item: FavoriteItem):
-    await favorite_item_repository.update_favorite_items(favorite_item_id, favorite_item)
+async def update_favorite_items(favorite_item_id: int, favorite_item: FavoriteItem, previous_user_id: int):
+    await favorite_item_repository.update_favorite_items(favorite_item_id, favorite_item, previous_user_id)
 
 
-async def delete_by_id(favorite_item_id: int):
-    await favorite_item_repository.delete_by_id(favorite_item_id)
+async def delete_by_id(favorite_item_id: int, user_id: int):
+    await favorite_item_repository.delete_by_id(favorite_item_id, user_id)
 
 
 async def delete_by_user_and_item_id(user_id: int, item_id: int):
@@ -1,19 +1,25 @@
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 from model.item import Item
-from repository import item_repository, favorite_item_repository, order_repository, order_item_repository
+from model.page import Page
+from repository import item_repository, order_repository
 
 
 async def get_item_by_id(item_id: int) -> Optional[Item]:
-    return await item_repository.get_item_by_id(item_id)
+    return await item_repository.load_item(item_id)
+
+
+async def get_items_by_ids(item_ids: List[int]) -> Dict[int, Item]:
+    return await item_repository.load_items(item_ids)
 
 
 async def get_item_by_name(item_name: str):
     return await item_repository.get_item_by_name(item_name)
 
 
-async def get_all_items() -> List[Item]:
-    return await item_repository.get_all_items()
+async def get_all_items(limit: int, after_id: int = 0) -> Page[Item]:
+    items = await item_repository.get_all_items(limit + 1, after_id)
+    return Page.from_results(items, limit)
 
 
 async def create_item(item: Item) -> int:
@@ -25,15 +31,5 @@ async def update_item(item_id: int, item: Item):
 
 
 async def delete_item_by_id(item_id: int):
-    favorite_items = await favorite_item_repository.get_all_favorite_items()
-    favorite_item_ids = {item.item_id for item in favorite_items}
-    if item_id in favorite_item_ids:
-        await favorite_item_repository.delete_favorite_items_by_item_id(item_id)
-
-    temp_orders = await order_repository.get_all_temp_orders()
-    for order in temp_orders:
-        order_items = await order_item_repository.get_order_items_by_order_id(order.id)
-        order_item_ids = {order_item.item_id for order_item in order_items}
-        if item_id in order_item_ids:
-            await order_item_repository.delete_order_item(order.id, item_id)
-    await item_repository.delete_item_by_id(item_id)
+    affected_user_ids = await item_repository.delete_item_by_id(item_id)
+    await order_repository.invalidate_cart(*affected_user_ids)
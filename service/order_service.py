@@ -1,21 +1,21 @@
 from datetime import date
-from typing import Optional, List, Dict
+from typing import AsyncIterator, Optional, List, Dict
 
-from model.item import Item
 from model.order import Order
 from model.order_item import OrderItem
-from model.order_item_detail import OrderItemDetail
 from model.order_request import OrderRequest
 from model.order_response import OrderResponse
+from model.page import Page
 from model.order_status import OrderStatus
 from repository import order_repository, item_repository, user_repository, order_item_repository
-from service import item_service
+from service import export_service
 
 
 async def compute_total_price(item_quantities: Dict[int, int]) -> float:
     total_price = 0
+    items = await item_repository.load_items(list(item_quantities))
     for item_id, quantity in item_quantities.items():
-        item = await item_repository.get_item_by_id(item_id)
+        item = items.get(item_id)
         if item:
             total_price += item.price * quantity
     return total_price
@@ -24,9 +24,10 @@ async def compute_total_price(item_quantities: Dict[int, int]) -> float:
 async def validate_item_quantities_and_stock(item_quantities: dict):
     invalid_items = []
     insufficient_stock_items = []
+    items = await item_repository.load_items(list(item_quantities))
 
     for item_id, quantity in item_quantities.items():
-        item_details = await item_repository.get_item_by_id(item_id)
+        item_details = items.get(item_id)
 
         if not item_details:
             invalid_items.append(item_id)
@@ -41,114 +42,31 @@ async def validate_item_quantities_and_stock(item_quantities: dict):
 
 
 async def get_order_by_id(order_id: int) -> Optional[OrderResponse]:
-    order = await order_repository.get_order_by_id(order_id)
-    if not order:
-        return None
-
-    order_items = await order_item_repository.get_order_items_by_order_id(order_id)
-    items = []
-    total_price = 0
-
-    for order_item in order_items:
-        item = await item_service.get_item_by_id(order_item.item_id)
-        if not item:
-            raise ValueError(f"Item with ID {order_item.item_id} not found.")
-        items.append(OrderItemDetail(
-            item_id=item.id,
-            name=item.name,
-            price=item.price,
-            quantity=order_item.quantity,
-            item_stock=item.item_stock
-        ))
-        total_price += item.price * order_item.quantity
-
-    order_response = OrderResponse(
-        id=order.id,
-        item=items,
-        total_price=total_price,
-        shipping_address=order.shipping_address,
-        order_date=order.order_date,
-        status=order.status
-    )
-    return order_response
+    return await order_repository.get_order_response_by_id(order_id)
 
 
 async def get_order_by_user_id(user_id: int) -> List[OrderResponse]:
-    user_order = await order_repository.get_order_by_user_id(user_id)
-    if not user_order:
-        return []
-
-    response = []
-
-    for order in user_order:
-        order_items = await order_item_repository.get_order_items_by_order_id(order.id)
-        items = []
-        total_price = 0
-
-        for order_item in order_items:
-            item = await item_service.get_item_by_id(order_item.item_id)
-            if not item:
-                raise ValueError(f"Item with ID {order_item.item_id} not found.")
-
-            items.append(OrderItemDetail(
-                item_id=item.id,
-                name=item.name,
-                price=item.price,
-                quantity=order_item.quantity,
-                item_stock=item.item_stock
-            ))
-
-            total_price += item.price * order_item.quantity
-
-        response.append(
-            OrderResponse(
-                id=order.id,
-                item=items,
-                total_price=total_price,
-                shipping_address=order.shipping_address,
-                order_date=order.order_date,
-                status=order.status
-            )
-        )
-    return response
+    return await order_repository.get_order_responses_by_user_id(user_id)
 
 
 async def get_temp_order_by_user_id(user_id: int) -> Optional[OrderResponse]:
     temp_order = await order_repository.get_temp_order_by_user_id(user_id)
     if not temp_order:
         return None
+    return await order_repository.get_order_response_by_id(temp_order.id, user_id)
 
-    order_items = await order_item_repository.get_order_items_by_order_id(temp_order.id)
-    items = []
-    total_price = 0
 
-    for order_item in order_items:
-        item = await item_service.get_item_by_id(order_item.item_id)
-        if not item:
-            raise ValueError(f"Item with ID {order_item.item_id} not found.")
-
-        items.append(OrderItemDetail(
-                item_id=item.id,
-                name=item.name,
-                price=item.price,
-                quantity=order_item.quantity,
-                item_stock=item.item_stock
-            ))
-        total_price += item.price * order_item.quantity
-
-    order_response = OrderResponse(
-        id=temp_order.id,
-        item=items,
-        total_price=total_price,
-        shipping_address=temp_order.shipping_address,
-        order_date=temp_order.order_date,
-        status=temp_order.status
-    )
-    return order_response
+async def get_all_orders(limit: int, after_id: int = 0) -> Page[Order]:
+    orders = await order_repository.get_all_orders(limit + 1, after_id)
+    return Page.from_results(orders, limit)
+
+
+def export_orders(export_format: str) -> AsyncIterator[str]:
+    return export_service.export_rows(Order, order_repository.iterate_all_orders(), export_format)
 
 
-async def get_all_orders() -> List[Order]:
-    return await order_repository.get_all_orders()
+def export_order_items(export_format: str) -> AsyncIterator[str]:
+    return export_service.export_rows(OrderItem, order_item_repository.iterate_all_order_items(), export_format)
 
 
 async def create_order(order_request: OrderRequest):
@@ -178,15 +96,11 @@ async def create_order(order_request: OrderRequest):
             total_price=total_price,
             status=order_request.status
         )
-        order_id = await order_repository.create_order(order)
+        order_id = await order_repository.create_order(order, order_request.item_quantities)
 
         if not order_id:
             raise ValueError("Failed to create order in the database.")
 
-        for item_id, quantity in order_request.item_quantities.items():
-            order_item = OrderItem(order_id=order_id, item_id=item_id, quantity=quantity)
-            await order_item_repository.create_order_items(order_item)
-
     except Exception as e:
         raise ValueError(f"Failed to create order: {e}")
 
@@ -235,9 +149,10 @@ async def update_order(order_id: int, order_request: OrderRequest):
     remaining_items = await order_item_repository.get_order_items_by_order_id(order_id)
     if not remaining_items and updated_order.status == OrderStatus.TEMP:
         await order_repository.delete_order_by_id(order_id)
+    await order_repository.invalidate_cart(order.user_id, order_request.user_id)
 
 
-async def update_temp_order(user_id: int, item_id: int, quantity: int):
+async def update_temp_order(user_id: int, item_id: int, quantity: int) -> Optional[OrderResponse]:
     temp_order = await order_repository.get_temp_order_by_user_id(user_id)
     if not temp_order:
         raise ValueError("TEMP Order not found")
@@ -247,25 +162,7 @@ async def update_temp_order(user_id: int, item_id: int, quantity: int):
         if invalid_items or insufficient_stock_items:
             raise ValueError(f"Items '{invalid_items}' are invalid or the quantity is out of stock.")
 
-    if quantity == 0:
-        await order_item_repository.delete_order_item(temp_order.id, item_id)
-    else:
-        order_item = OrderItem(order_id=temp_order.id, item_id=item_id, quantity=quantity)
-        existing_item = await order_item_repository.get_order_item(temp_order.id, item_id)
-        if existing_item:
-            await order_item_repository.update_order_item(temp_order.id, order_item)
-        else:
-            await order_item_repository.create_order_items(order_item)
-
-    remaining_items = await order_item_repository.get_order_items_by_order_id(temp_order.id)
-    if not remaining_items:
-        await order_repository.delete_order_by_id(temp_order.id)
-
-    order_items = await order_item_repository.get_order_items_by_order_id(temp_order.id)
-    updated_item_quantities = {item.item_id: item.quantity for item in order_items}
-    total_price = await compute_total_price(updated_item_quantities)
-
-    await order_repository.update_temp_order(temp_order.id, total_price)
+    return await order_repository.set_temp_order_item(temp_order.id, user_id, item_id, quantity)
 
 
 async def update_order_status(user_id: int, shipping_address: str, status: OrderStatus):
@@ -276,38 +173,7 @@ async def update_order_status(user_id: int, shipping_address: str, status: Order
     date_close = date.today()
 
     if status == OrderStatus.CLOSE:
-        order_id = temp_order.id
-        order_items = await order_item_repository.get_order_items_by_order_id(order_id)
-        under_stock_item = []
-        updated_items = []
-
-        for order_item in order_items:
-            item_data = await item_repository.get_item_by_id(order_item.item_id)
-            if not item_data:
-                raise ValueError(f"Item with ID {order_item.item_id} not found")
-
-            if order_item.quantity > item_data.item_stock:
-                under_stock_item.append(
-                    {"item_id": item_data.id, "item_name": item_data.name, "required": order_item.quantity,
-                     "available": item_data.item_stock}
-                )
-            else:
-                new_stock = item_data.item_stock - order_item.quantity
-                updated_items.append(
-                    Item(
-                        id=item_data.id,
-                        name=item_data.name,
-                        price=item_data.price,
-                        item_stock=new_stock
-                    )
-                )
-        if under_stock_item:
-            raise ValueError(f"Insufficient stock for items: {under_stock_item}")
-
-        for updated_item in updated_items:
-            await item_repository.update_item(updated_item.id, updated_item)
-
-        await order_repository.update_order_status(order_id, shipping_address, status, date_close)
+        await order_repository.close_order(temp_order.id, user_id, shipping_address, date_close)
 
 
 async def delete_order_by_id(order_id: int):
@@ -320,3 +186,6 @@ async def delete_item_from_order(order_id: int, item_id: int):
     remaining_items = await order_item_repository.get_order_items_by_order_id(order_id)
     if not remaining_items:
         await order_repository.delete_order_by_id(order_id)
+    else:
+        order = await order_repository.get_order_by_id(order_id)
+        await order_repository.invalidate_cart(order.user_id)
@@ -1,13 +1,13 @@
-from typing import Optional, List
+from typing import Optional
 
 from passlib.context import CryptContext
 
 from exceptions.security_exceptions import username_taken_exception
 from model.user import User
 from model.user_request import UserRequest
+from model.page import Page
 from model.user_response import UserResponse
-from repository import user_repository, favorite_item_repository, order_repository
-from service import order_service
+from repository import user_repository, order_repository
 
 bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -25,22 +25,8 @@ async def validate_unique_username(username: str) -> bool:
     return user_exists is None
 
 
-def user_to_response(user: User) -> UserResponse:
-    return UserResponse(
-        id=user.id,
-        username=user.username,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        email=user.email,
-        address=user.address,
-        country=user.country,
-        city=user.city,
-    )
-
-
 async def get_user_by_id(user_id: int) -> Optional[UserResponse]:
-    user = await user_repository.get_user_by_id(user_id)
-    return user_to_response(user) if user else None
+    return await user_repository.get_user_by_id(user_id)
 
 
 async def get_user_by_username(username: str) -> Optional[User]:
@@ -48,9 +34,9 @@ async def get_user_by_username(username: str) -> Optional[User]:
     return user
 
 
-async def get_all_users() -> List[UserResponse]:
-    users = await user_repository.get_all_users()
-    return [user_to_response(user) for user in users]
+async def get_all_users(limit: int, after_id: int = 0) -> Page[UserResponse]:
+    users = await user_repository.get_all_users(limit + 1, after_id)
+    return Page.from_results([user_repository.user_to_response(user) for user in users], limit)
 
 
 async def create_user(user_request: UserRequest):
@@ -74,13 +60,9 @@ async def logout_user(user_id: int):
     await user_repository.logout_user(user_id)
 
 
-async def delete_user_by_id(user_id):
-    user_orders = await order_service.get_order_by_user_id(user_id)
-    user_favorites = await favorite_item_repository.get_favorite_items_by_user_id(user_id)
-    if user_orders:
-        await order_repository.delete_order_by_user_id(user_id)
-    if user_favorites:
-        await favorite_item_repository.delete_favorites_by_user_id(user_id)
+async def delete_user_by_id(user_id: int, chunk_size: Optional[int] = None):
+    if chunk_size:
+        await order_repository.delete_orders_by_user_id_in_chunks(user_id, chunk_size)
     await user_repository.delete_user_by_id(user_id)
 
 
@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+# The suite runs on the local profile (SQLite file plus in-process Redis) and needs the debug counter headers.
+# Config is read when the app modules are imported, so this has to happen before the first import of main.
+os.environ["RUNTIME_PROFILE"] = "local"
+os.environ["LOCAL_DATABASE_PATH"] = str(Path(tempfile.mkdtemp(prefix="shop-tests-")) / "local.db")
+os.environ["DEBUG"] = "true"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def budget():
+    def check(response, queries: int, redis_commands: Optional[int]):
+        route = f"{response.request.method} {response.request.url.path}"
+        db_queries = int(response.headers["X-DB-Queries"])
+        redis = int(response.headers["X-Redis-Commands"])
+        assert db_queries <= queries, f"{route} ran {db_queries} DB queries, budget is {queries}"
+        if redis_commands is not None:
+            assert redis <= redis_commands, f"{route} ran {redis} Redis commands, budget is {redis_commands}"
+        return response
+
+    return check
+
+
+@pytest.fixture
+def user(client):
+    username = f"budget_{time.time_ns()}"
+    response = client.post("/user/", json={
+        "first_name": "Budget", "last_name": "User", "email": "budget@example.com", "phone": "0",
+        "address": "1 Main St", "country": "Israel", "city": "Tel Aviv", "username": username, "password": "secret",
+    })
+    assert response.status_code == 201, response.text
+    auth = client.post("/auth/token", data={"username": username, "password": "secret"}).json()
+    return {"id": auth["user_id"], "username": username, "headers": {"Authorization": f"Bearer {auth['jwt_token']}"}}
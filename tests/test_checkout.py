@@ -0,0 +1,32 @@
+import time
+
+
+def create_item(client, stock: int) -> int:
+    response = client.post("/item/", json={"name": f"Checkout item {time.time_ns()}", "price": 1, "item_stock": stock})
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def test_under_stock_report_lists_only_short_lines(client, user):
+    enough_id = create_item(client, 5)
+    short_id = create_item(client, 5)
+    response = client.post("/order/", json={
+        "user_id": user["id"], "shipping_address": "1 Main St", "total_price": 0, "status": "TEMP",
+        "item_quantities": {str(enough_id): 3, str(short_id): 2},
+    })
+    assert response.status_code == 200, response.text
+    order_id = client.get(f"/order/temp/{user['id']}").json()["id"]
+    response = client.put(f"/item/{short_id}", json={"name": f"Short item {short_id}", "price": 1, "item_stock": 1})
+    assert response.status_code == 200, response.text
+
+    response = client.put(f"/order/purchase/{order_id}", json={
+        "order_id": order_id, "user_id": user["id"], "shipping_address": "1 Main St", "status": "CLOSE",
+    })
+
+    assert response.status_code == 500
+    detail = response.json()["detail"]
+    assert f"'item_id': {short_id}, " in detail
+    assert "'required': 2, 'available': 1" in detail
+    assert f"'item_id': {enough_id}, " not in detail
+    assert client.get(f"/item/{enough_id}").json()["item_stock"] == 5
+    assert client.get(f"/order/{order_id}").json()["status"] == "TEMP"
@@ -0,0 +1,29 @@
+import pytest
+
+
+def db_queries(response) -> int:
+    assert response.status_code == 200, response.text
+    return int(response.headers["X-DB-Queries"])
+
+
+@pytest.mark.parametrize("orders, lines", [(1, 1), (3, 5), (20, 5)])
+def test_order_reads_run_one_query(client, user, orders, lines):
+    for _ in range(orders):
+        response = client.post("/order/", json={
+            "user_id": user["id"], "shipping_address": "1 Main St", "total_price": 0, "status": "CLOSE",
+            "item_quantities": {str(item_id): 1 for item_id in range(1, lines + 1)},
+        })
+        assert response.status_code == 200, response.text
+
+    # Load the user into the cache first, so the route's own user check does not count as an order query.
+    client.get(f"/order/user/{user['id']}")
+    response = client.get(f"/order/user/{user['id']}")
+    assert db_queries(response) == 1
+    user_orders = response.json()
+    assert len(user_orders) == orders
+    assert all(len(order["item"]) == lines for order in user_orders)
+
+    for order in user_orders[:3]:
+        response = client.get(f"/order/{order['id']}")
+        assert db_queries(response) == 1
+        assert len(response.json()["item"]) == lines
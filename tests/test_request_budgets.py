@@ -0,0 +1,132 @@
+import pandas as pd
+
+
+def create_temp_order(client, user_id: int, item_quantities: dict) -> int:
+    response = client.post("/order/", json={
+        "user_id": user_id, "shipping_address": "1 Main St", "item_quantities": item_quantities, "total_price": 0,
+        "status": "TEMP",
+    })
+    assert response.status_code == 200, response.text
+    return client.get(f"/order/temp/{user_id}").json()["id"]
+
+
+def create_favorite_item(client, user_id: int, item_id: int) -> int:
+    assert client.post("/favorite_item/", json={"user_id": user_id, "item_id": item_id}).status_code == 200
+    favorite_items = client.get("/favorite_item/", params={"limit": 500}).json()["items"]
+    return next(
+        favorite["id"] for favorite in favorite_items
+        if favorite["user_id"] == user_id and favorite["item_id"] == item_id
+    )
+
+
+def test_item_reads(client, budget):
+    client.get("/item/1")
+    budget(client.get("/item/1"), queries=0, redis_commands=0)
+    client.get("/item/")
+    budget(client.get("/item/"), queries=0, redis_commands=0)
+
+
+def test_missing_item_is_negatively_cached(client, budget):
+    assert budget(client.get("/item/9999"), queries=1, redis_commands=6).status_code == 404
+    assert budget(client.get("/item/9999"), queries=0, redis_commands=2).status_code == 404
+
+
+def test_item_writes(client, budget):
+    response = budget(client.post("/item/", json={"name": "Budget lamp", "price": 2.5, "item_stock": 10}),
+                      queries=2, redis_commands=8)
+    item_id = response.json()["id"]
+    budget(client.put(f"/item/{item_id}", json={"name": "Budget lamp", "price": 3, "item_stock": 10}),
+           queries=2, redis_commands=8)
+    budget(client.delete(f"/item/{item_id}"), queries=5, redis_commands=8)
+
+
+def test_user_routes(client, budget, user):
+    client.get(f"/user/{user['id']}", headers=user["headers"])
+    budget(client.get(f"/user/{user['id']}", headers=user["headers"]), queries=0, redis_commands=4)
+    budget(client.get("/user/", headers=user["headers"]), queries=1, redis_commands=2)
+    budget(client.put(f"/user/{user['id']}", headers=user["headers"], json={
+        "first_name": "Budget", "last_name": "Renamed", "email": "budget@example.com", "phone": "0",
+        "address": "2 Main St", "country": "Israel", "city": "Haifa", "username": user["username"],
+        "password": "secret",
+    }), queries=1, redis_commands=6)
+    budget(client.put("/user/logout/", headers=user["headers"]), queries=1, redis_commands=3)
+
+
+def test_create_and_delete_user(client, budget):
+    response = budget(client.post("/user/", json={
+        "first_name": "Short", "last_name": "Lived", "email": "short@example.com", "phone": "0", "address": "x",
+        "country": "x", "city": "x", "username": "budget_short_lived", "password": "secret",
+    }), queries=2, redis_commands=2)
+    assert response.status_code == 201, response.text
+    auth = budget(client.post("/auth/token", data={"username": "budget_short_lived", "password": "secret"}),
+                  queries=3, redis_commands=2).json()
+    headers = {"Authorization": f"Bearer {auth['jwt_token']}"}
+    budget(client.delete(f"/user/{auth['user_id']}", headers=headers), queries=8, redis_commands=8)
+
+
+def test_failed_login(client, budget):
+    response = budget(client.post("/auth/token", data={"username": "nobody", "password": "x"}),
+                      queries=1, redis_commands=0)
+    assert response.status_code == 401
+
+
+def test_order_reads(client, budget, user):
+    order_id = create_temp_order(client, user["id"], {"1": 1, "2": 2})
+    budget(client.get(f"/order/{order_id}"), queries=1, redis_commands=0)
+    client.get(f"/order/user/{user['id']}")
+    budget(client.get(f"/order/user/{user['id']}"), queries=1, redis_commands=2)
+    budget(client.get(f"/order/temp/{user['id']}"), queries=1, redis_commands=3)
+    budget(client.get("/order/"), queries=1, redis_commands=0)
+    budget(client.get("/order/export"), queries=1, redis_commands=0)
+    budget(client.get("/order/items/export", params={"format": "csv"}), queries=1, redis_commands=0)
+
+
+def test_order_writes(client, budget, user):
+    order_id = create_temp_order(client, user["id"], {"1": 1})
+    budget(client.put("/order/update_order_quantities/", json={"user_id": user["id"], "item_id": 3, "quantity": 2}),
+           queries=4, redis_commands=10)
+    budget(client.put(f"/order/{order_id}", json={
+        "user_id": user["id"], "shipping_address": "2 Main St", "item_quantities": {"1": 2, "2": 1},
+        "total_price": 0, "status": "TEMP",
+    }), queries=8, redis_commands=8)
+    budget(client.delete(f"/order/{order_id}/item/2"), queries=5, redis_commands=4)
+    budget(client.put(f"/order/purchase/{order_id}", json={
+        "order_id": order_id, "user_id": user["id"], "shipping_address": "3 Main St", "status": "CLOSE",
+    }), queries=8, redis_commands=8)
+    budget(client.delete(f"/order/{order_id}"), queries=4, redis_commands=4)
+
+
+def test_create_order(client, budget, user):
+    response = budget(client.post("/order/", json={
+        "user_id": user["id"], "shipping_address": "1 Main St", "item_quantities": {"1": 1, "2": 1, "3": 1},
+        "total_price": 0, "status": "TEMP",
+    }), queries=4, redis_commands=11)
+    assert response.status_code == 200, response.text
+
+
+def test_favorite_item_routes(client, budget, user):
+    response = budget(client.post("/favorite_item/", json={"user_id": user["id"], "item_id": 2}),
+                      queries=2, redis_commands=4)
+    assert response.status_code == 200, response.text
+    budget(client.get(f"/favorite_item/user/{user['id']}"), queries=1, redis_commands=5)
+    favorite_item_id = create_favorite_item(client, user["id"], 3)
+    budget(client.get(f"/favorite_item/{favorite_item_id}"), queries=1, redis_commands=0)
+    budget(client.get("/favorite_item/"), queries=1, redis_commands=0)
+    budget(client.put(f"/favorite_item/{favorite_item_id}", json={"user_id": user["id"], "item_id": 4}),
+           queries=3, redis_commands=2)
+    budget(client.delete(f"/favorite_item/{user['id']}/item/4"), queries=2, redis_commands=2)
+    favorite_item_id = create_favorite_item(client, user["id"], 5)
+    budget(client.delete(f"/favorite_item/{favorite_item_id}"), queries=2, redis_commands=2)
+
+
+def test_admin_routes(client, budget):
+    budget(client.get("/cache/stats"), queries=0, redis_commands=0)
+    budget(client.get("/cache/memory"), queries=0, redis_commands=None)
+    budget(client.get("/database/pool"), queries=0, redis_commands=0)
+
+
+def test_churn_prediction_routes(client, budget, user):
+    budget(client.get("/user_data/performance_metrics/"), queries=0, redis_commands=0)
+    features = pd.read_csv("resources/csv/user_churn_data.csv").drop(columns=["user_id", "churned"]).iloc[0]
+    budget(client.post("/user_data/predict_new/", json=features.to_dict()), queries=0, redis_commands=0)
+    budget(client.get(f"/user_data/{user['id']}/predict", headers=user["headers"]), queries=0, redis_commands=2)